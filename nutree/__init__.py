@@ -27,6 +27,7 @@ from .common import (
     UniqueConstraintError,
 )
 from .diff import DiffClassification, diff_node_formatter
+from .frozen_tree import FrozenNode, FrozenTree
 from .fs import load_tree_from_fs
 from .node import Node
 from .tree import Tree
@@ -38,6 +39,8 @@ __all__ = [
     AmbiguousMatchError,
     diff_node_formatter,
     DiffClassification,
+    FrozenNode,
+    FrozenTree,
     IterMethod,
     load_tree_from_fs,
     SelectBranch,
@@ -4,6 +4,7 @@
 Functions and declarations used by the :mod:`nutree.tree` and :mod:`nutree.node`
 modules.
 """
+import re
 import warnings
 from enum import Enum
 from typing import TYPE_CHECKING, Any, Callable, Union
@@ -113,6 +114,24 @@ CONNECTORS = {
 }
 
 
+def make_match_callback(match) -> Callable[["Node"], Any]:
+    """Return a function that implements the `match` argument of `find_all()`.
+
+    `match` may be a callable, a regular expression string, or a
+    `(pattern, flags)` tuple that is matched against `node.name`.
+    Any other value is compared to `node.data` by identity.
+    """
+    if callable(match):
+        return match
+    elif type(match) is str:
+        pattern = re.compile(pattern=match)
+    elif isinstance(match, (list, tuple)):
+        pattern = re.compile(pattern=match[0], flags=match[1])
+    else:
+        return lambda node: node.data is match
+    return lambda node: pattern.fullmatch(node.name)
+
+
 def call_mapper(fn, node: "Node", data: dict) -> Any:
     """Call the function and normalize result and exceptions.
 
@@ -3,7 +3,7 @@
 """
 Implement diff/merge algorithms.
 """
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict, Generator
 
 if TYPE_CHECKING:  # Imported by type checkers, but prevent circular includes
     from .tree import Tree, Node
@@ -22,23 +22,24 @@ class DiffClassification(Enum):
 DC = DiffClassification
 
 
-def _find_child(arr, child):
-    for i, c in enumerate(arr):
-        if c == child:
-            return (i, c)
-    return (-1, None)
-
-
-def _copy_children(source: "Node", dest: "Node", add_set: set, meta: tuple) -> None:
+def _copy_children(source: "Node", dest: "Node", added: list, meta: tuple) -> None:
     assert source.has_children() and not dest.has_children()
-    for n in source.children:
-        n_dest = dest.append_child(n)
-        add_set.add(n_dest._node_id)
-        if meta:
-            n_dest.set_meta(*meta)
-        if n._children:
-            # meta is only set on top node
-            _copy_children(n, n_dest, add_set, meta=None)
+    # Non-recursive, pre-order: stack of `(dest_parent, source_iterator)`
+    stack = [(dest, iter(source._children))]
+    while stack:
+        parent, source_iter = stack[-1]
+        for n in source_iter:
+            n_dest = parent.append_child(n)
+            if added is not None:
+                added.append(n_dest._node_id)
+            if meta and parent is dest:
+                # meta is only set on top nodes
+                n_dest.set_meta(*meta)
+            if n._children:
+                stack.append((n_dest, iter(n._children)))
+                break
+        else:
+            stack.pop()
     return
 
 
@@ -83,15 +84,41 @@ def diff_tree(t0: "Tree", t1: "Tree", *, ordered=False, reduce=False) -> "Tree":
     from nutree import Tree
 
     t2 = Tree(f"diff({t0.name!r}, {t1.name!r})")
-    added_nodes = set()
+    # Use a list, so re-classification below is deterministic
+    added_nodes = []
     removed_nodes = set()
+    # Subtree fingerprints, used to skip identical branches. Reuse the trees'
+    # caches if they exist, but don't create them: they would be kept and
+    # cost memory and maintenance on every later modification
+    fp_0 = t0._fingerprints.get(False, {})
+    fp_1 = t1._fingerprints.get(False, {})
+
+    def is_identical(c0: "Node", c1: "Node") -> bool:
+        """Return true if peers have the same data_ids and structure."""
+        if not c0._children or not c1._children:
+            return not c0._children and not c1._children
+        return c0._calc_fingerprint(fp_0) == c1._calc_fingerprint(fp_1)
 
     def compare(p0: "Node", p1: "Node", p2: "Node"):
+        """Compare the children of `p0` and `p1` and add results to `p2`.
+
+        Peer nodes that need a deeper comparison are appended to `pending`.
+        """
+        # Match peers by data_id in O(n + m), instead of scanning the p1
+        # children for every p0 child. If data_ids are not unique among
+        # siblings, the first one wins.
+        p1_peers = {}
+        for i1, c1 in enumerate(p1._children or ()):
+            p1_peers.setdefault(c1._data_id, (i1, c1))
+
         p0_data_ids = set()
-        # `p0.children` always returns an (empty) array
-        for i0, c0 in enumerate(p0.children):
+        for i0, c0 in enumerate(p0._children or ()):
             p0_data_ids.add(c0._data_id)
-            i1, c1 = _find_child(p1._children, c0)
+            i1, c1 = p1_peers.get(c0._data_id, (-1, None))
+
+            if reduce and c1 and not (ordered and i0 != i1) and is_identical(c0, c1):
+                # Unchanged branch would be removed by `filter()` anyway
+                continue
 
             c2 = p2.add(c0)
             if i0 == i1:
@@ -108,8 +135,12 @@ def diff_tree(t0: "Tree", t1: "Tree", *, ordered=False, reduce=False) -> "Tree":
                 removed_nodes.add(c2._node_id)
 
             if c0._children:
-                if c1:
-                    compare(c0, c1, c2)
+                if c1 and c1._children and is_identical(c0, c1):
+                    # Identical branches: no need to compare descendants
+                    if not reduce:
+                        _copy_children(c0, c2, None, None)
+                elif c1:
+                    pending.append((c0, c1, c2))
                     # if c1._children:
                     #     # c0 and c1 have children: Recursively visit peer nodes
                     #     compare(c0, c1, c2)
@@ -125,19 +156,19 @@ def diff_tree(t0: "Tree", t1: "Tree", *, ordered=False, reduce=False) -> "Tree":
             elif c1:
                 if c1._children:
                     # c1 has children and c0 exists, but has no children
-                    compare(c0, c1, c2)
+                    pending.append((c0, c1, c2))
                 else:
                     # Neither c0 nor c1 have children: Nothing to do
                     pass
 
         # print(p1, p1._children, p0_data_ids)
         # Collect t1 nodes that are not in t0:
-        for c1 in p1.children:  # `p1.children` always returns an (empty) array
+        for c1 in p1._children or ():
             # print("  ", c1, c1._data_id in p0_data_ids)
             if c1._data_id not in p0_data_ids:
                 c2 = p2.add(c1)
                 c2.set_meta("dc", DC.ADDED)
-                added_nodes.add(c2._node_id)
+                added_nodes.append(c2._node_id)
                 if c1._children:
                     # c1 has children, but c0 does not even exist
                     # TODO: Copy children from c1 to c2, but we need to check
@@ -149,7 +180,10 @@ def diff_tree(t0: "Tree", t1: "Tree", *, ordered=False, reduce=False) -> "Tree":
                     pass
         return  # def compare()
 
-    compare(t0._root, t1._root, t2._root)
+    # Non-recursive: process a stack of peer node triples
+    pending = [(t0._root, t1._root, t2._root)]
+    while pending:
+        compare(*pending.pop())
 
     # Re-classify: check added/removed nodes for move operations
     # print(added_nodes)
@@ -174,3 +208,103 @@ def diff_tree(t0: "Tree", t1: "Tree", *, ordered=False, reduce=False) -> "Tree":
         t2.filter(predicate=pred)
 
     return t2
+
+
+def diff_ops(t0: "Tree", t1: "Tree", *, ordered=False) -> Generator[Dict, None, None]:
+    """Yield a sequence of operations that transform `t0` into `t1`.
+
+    Unlike :func:`diff_tree`, no merged tree is created, so memory use is
+    proportional to the number of changes.
+
+    Every operation is a dict with an `op` key. Parent nodes are referenced
+    by `parent`, a tuple of data_ids from the toplevel down to the parent
+    (``()`` for toplevel nodes), in terms of `t1`:
+
+    - ``{"op": "add", "parent", "index", "after", "data_id", "data"}``:
+      Add a new node. `after` is the data_id of the preceding sibling (None
+      if the node is the first child) and `index` is the position in `t1`.
+      Descendants of added nodes are yielded as separate operations.
+    - ``{"op": "move", "parent", "index", "after", "data_id"}``:
+      Move the node with `data_id` (unique in both trees) to `parent`.
+    - ``{"op": "reorder", "parent", "order"}``:
+      Sort children by a list of data_ids (only if `ordered` is true and
+      the relative order of unchanged children differs).
+    - ``{"op": "remove", "parent", "data_id"}``:
+      Remove the child with `data_id`. Removals are yielded last, so moved
+      nodes are taken out of removed branches before.
+
+    Nodes are matched by data_id. A node is considered moved if its data_id
+    is unique in both trees; otherwise (i.e. for clones) the change is
+    reported as `remove` and `add`.
+    """
+    ids_0 = t0._nodes_by_data_id
+    ids_1 = t1._nodes_by_data_id
+
+    def _is_move(data_id) -> bool:
+        clones_0 = ids_0.get(data_id)
+        clones_1 = ids_1.get(data_id)
+        return bool(clones_0 and clones_1) and len(clones_0) == len(clones_1) == 1
+
+    removed = []
+    # Non-recursive, pre-order: stack of `(p0, p1, parent_path)`, where `p0`
+    # is None for nodes that were added
+    stack = [(t0._root, t1._root, ())]
+    while stack:
+        p0, p1, path = stack.pop()
+
+        p0_peers = {}
+        if p0 is not None:
+            for i0, c0 in enumerate(p0._children or ()):
+                p0_peers.setdefault(c0._data_id, (i0, c0))
+
+        p1_data_ids = set()
+        prev_data_id = None
+        prev_i0 = -1
+        reordered = False
+        pairs = []
+        for i1, c1 in enumerate(p1._children or ()):
+            data_id = c1._data_id
+            p1_data_ids.add(data_id)
+            i0, c0 = p0_peers.get(data_id, (-1, None))
+            if c0 is not None:
+                if i0 < prev_i0:
+                    reordered = True
+                prev_i0 = i0
+            elif _is_move(data_id):
+                c0 = next(iter(ids_0[data_id].values()))
+                yield {
+                    "op": "move",
+                    "parent": path,
+                    "index": i1,
+                    "after": prev_data_id,
+                    "data_id": data_id,
+                }
+            else:
+                yield {
+                    "op": "add",
+                    "parent": path,
+                    "index": i1,
+                    "after": prev_data_id,
+                    "data_id": data_id,
+                    "data": c1._data,
+                }
+            if c1._children or (c0 is not None and c0._children):
+                pairs.append((c0, c1, path + (data_id,)))
+            prev_data_id = data_id
+
+        if ordered and reordered:
+            yield {
+                "op": "reorder",
+                "parent": path,
+                "order": [c._data_id for c in p1._children],
+            }
+
+        if p0 is not None:
+            for c0 in p0._children or ():
+                data_id = c0._data_id
+                if data_id not in p1_data_ids and not _is_move(data_id):
+                    removed.append({"op": "remove", "parent": path, "data_id": data_id})
+
+        stack.extend(reversed(pairs))
+
+    yield from removed
@@ -0,0 +1,781 @@
+# (c) 2021-2023 Martin Wendt and contributors; see https://github.com/mar10/nutree
+# Licensed under the MIT license: https://www.opensource.org/licenses/mit-license.php
+"""
+Declare the :class:`~nutree.frozen_tree.FrozenTree` class.
+"""
+import random
+from array import array
+from typing import IO, TYPE_CHECKING, Any, Dict, Generator, List, Union
+
+if TYPE_CHECKING:  # Imported by type checkers, but prevent circular includes
+    from .tree import Tree
+
+from .common import (
+    CONNECTORS,
+    AmbiguousMatchError,
+    ItemIdType,
+    IterMethod,
+    MapperCallbackType,
+    call_mapper,
+    make_match_callback,
+)
+from .node import Node
+
+#: Typecode of the index arrays (signed int, -1 means 'no node')
+_IDX_TYPE = "i"
+
+
+# ------------------------------------------------------------------------------
+# - FrozenNode
+# ------------------------------------------------------------------------------
+class FrozenNode:
+    """
+    A lightweight, read-only view of one node inside a
+    :class:`~nutree.frozen_tree.FrozenTree`.
+
+    Views are created on demand and only reference the tree and an index,
+    so use :attr:`node_id` instead of ``is`` to check for identity.
+    """
+
+    __slots__ = ("_tree", "_idx")
+
+    #: Default value for ``repr`` argument when formatting data for print/display.
+    DEFAULT_RENDER_REPR = Node.DEFAULT_RENDER_REPR
+
+    def __init__(self, tree: "FrozenTree", idx: int):
+        self._tree = tree
+        self._idx = idx
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}<{self.name!r}, data_id={self.data_id}>"
+
+    def __eq__(self, other) -> bool:
+        """Implement ``node == other`` syntax to compare embedded data.
+
+        See :meth:`~nutree.node.Node.__eq__`.
+        """
+        if isinstance(other, (Node, FrozenNode)):
+            return self.data == other.data
+        return self.data == other
+
+    @property
+    def name(self) -> str:
+        """String representation of the embedded `data` object."""
+        return f"{self.data}"
+
+    @property
+    def path(self) -> str:
+        """All ancestor names including self, starting with and separated by '/'."""
+        return self.get_path(repr="{node.name}")
+
+    @property
+    def tree(self) -> "FrozenTree":
+        """Return container :class:`~nutree.frozen_tree.FrozenTree` instance."""
+        return self._tree
+
+    @property
+    def parent(self) -> Union["FrozenNode", None]:
+        """Return parent node or None for toplevel nodes."""
+        return self._tree._view(self._tree._parent[self._idx])
+
+    @property
+    def children(self) -> List["FrozenNode"]:
+        """Return list of direct child nodes (list may be empty)."""
+        return [
+            FrozenNode(self._tree, i) for i in self._tree._iter_child_idx(self._idx)
+        ]
+
+    @property
+    def data(self) -> Any:
+        """Return the wrapped data instance."""
+        return self._tree._data[self._idx]
+
+    @property
+    def data_id(self) -> ItemIdType:
+        """Return the wrapped data instance's id."""
+        return self._tree._get_data_id(self._idx)
+
+    @property
+    def node_id(self) -> int:
+        """Return the node's unique key (its position in pre-order)."""
+        return self._idx
+
+    @property
+    def meta(self) -> None:
+        """Frozen trees do not store metadata."""
+        return None
+
+    def get_meta(self, key: str, default=None):
+        """Return `default` (frozen trees do not store metadata)."""
+        return default
+
+    def get_children(self) -> List["FrozenNode"]:
+        """Return list of direct child nodes (list may be empty)."""
+        return self.children
+
+    def first_child(self) -> Union["FrozenNode", None]:
+        """First direct childnode or None if no children exist."""
+        return self._tree._view(self._tree._first_child[self._idx])
+
+    def last_child(self) -> Union["FrozenNode", None]:
+        """Last direct childnode or None if no children exist."""
+        last = -1
+        for last in self._tree._iter_child_idx(self._idx):
+            pass
+        return self._tree._view(last)
+
+    def get_siblings(self, *, add_self=False) -> List["FrozenNode"]:
+        """Return a list of all sibling entries of self (excluding self) if any."""
+        tree = self._tree
+        return [
+            FrozenNode(tree, i)
+            for i in tree._iter_child_idx(tree._parent[self._idx])
+            if add_self or i != self._idx
+        ]
+
+    def prev_sibling(self) -> Union["FrozenNode", None]:
+        """Predecessor or None, if node is first sibling."""
+        prev = -1
+        for i in self._tree._iter_child_idx(self._tree._parent[self._idx]):
+            if i == self._idx:
+                break
+            prev = i
+        return self._tree._view(prev)
+
+    def next_sibling(self) -> Union["FrozenNode", None]:
+        """Return successor or None, if node is last sibling."""
+        return self._tree._view(self._tree._next_sibling[self._idx])
+
+    def get_index(self) -> int:
+        """Return index in sibling list."""
+        for i, idx in enumerate(
+            self._tree._iter_child_idx(self._tree._parent[self._idx])
+        ):
+            if idx == self._idx:
+                return i
+        raise AssertionError("Internal error")
+
+    def get_clones(self, *, add_self=False) -> List["FrozenNode"]:
+        """Return a list of all nodes that reference the same data if any."""
+        tree = self._tree
+        return [
+            FrozenNode(tree, i)
+            for i in tree._get_indexes_by_data_id(self.data_id)
+            if add_self or i != self._idx
+        ]
+
+    def depth(self) -> int:
+        """Return the distance to the root node (1 for toplevel nodes)."""
+        return self._tree._depth[self._idx]
+
+    def count_descendants(self, *, leaves_only=False) -> int:
+        """Return number of descendant nodes, not counting self."""
+        tree = self._tree
+        branch = range(self._idx + 1, tree._branch_end(self._idx))
+        if leaves_only:
+            fc = tree._first_child
+            return sum(1 for i in branch if fc[i] < 0)
+        return len(branch)
+
+    def calc_height(self) -> int:
+        """Return the maximum depth of all descendants (0 for leaves)."""
+        tree = self._tree
+        end = tree._branch_end(self._idx)
+        if end == self._idx + 1:
+            return 0
+        return max(tree._depth[self._idx + 1 : end]) - tree._depth[self._idx]
+
+    def is_top(self) -> bool:
+        """Return true if this node has no parent."""
+        return self._tree._parent[self._idx] < 0
+
+    def is_leaf(self) -> bool:
+        """Return true if this node is an end node, i.e. has no children."""
+        return self._tree._first_child[self._idx] < 0
+
+    def has_children(self) -> bool:
+        """Return true if this node has one or more children."""
+        return self._tree._first_child[self._idx] >= 0
+
+    def is_clone(self) -> bool:
+        """Return true if this node's data is referenced at least one more time."""
+        return len(self._tree._get_indexes_by_data_id(self.data_id)) > 1
+
+    def is_first_sibling(self) -> bool:
+        """Return true if this node is the first sibling."""
+        tree = self._tree
+        parent = tree._parent[self._idx]
+        if parent < 0:
+            return self._idx == 0
+        return tree._first_child[parent] == self._idx
+
+    def is_last_sibling(self) -> bool:
+        """Return true if this node is the last sibling."""
+        return self._tree._next_sibling[self._idx] < 0
+
+    def is_descendant_of(self, other: "FrozenNode") -> bool:
+        """Return true if this node is direct or indirect child of `other`."""
+        # In pre-order, a branch occupies a contiguous index range
+        return (
+            other._tree is self._tree
+            and other._idx < self._idx < self._tree._branch_end(other._idx)
+        )
+
+    def is_ancestor_of(self, other: "FrozenNode") -> bool:
+        """Return true if this node is a parent, grandparent, ... of `other`."""
+        return other.is_descendant_of(self)
+
+    def get_top(self) -> "FrozenNode":
+        """Return toplevel ancestor (may be self)."""
+        parent = self._tree._parent
+        idx = self._idx
+        while parent[idx] >= 0:
+            idx = parent[idx]
+        return FrozenNode(self._tree, idx)
+
+    def get_parent_list(self, *, add_self=False, bottom_up=False) -> List["FrozenNode"]:
+        """Return ordered list of all parent nodes."""
+        tree = self._tree
+        res = []
+        idx = self._idx if add_self else tree._parent[self._idx]
+        while idx >= 0:
+            res.append(FrozenNode(tree, idx))
+            idx = tree._parent[idx]
+        if not bottom_up:
+            res.reverse()
+        return res
+
+    def get_path(self, *, add_self=True, separator="/", repr="{node.name}") -> str:
+        """Return a breadcrumb string, e.g. '/A/a1/a12'."""
+        res = (repr.format(node=p) for p in self.get_parent_list(add_self=add_self))
+        return separator + separator.join(res)
+
+    def iterator(
+        self, method=IterMethod.PRE_ORDER, *, add_self=False
+    ) -> Generator["FrozenNode", None, None]:
+        """Generator that walks the hierarchy."""
+        tree = self._tree
+        for idx in tree._iter_branch_idx(self._idx, method=method, add_self=add_self):
+            yield FrozenNode(tree, idx)
+
+    #: Implement ``for subnode in node: ...`` syntax to iterate descendant nodes.
+    __iter__ = iterator
+
+    def find_all(
+        self, data=None, *, match=None, data_id=None, add_self=False, max_results=None
+    ) -> List["FrozenNode"]:
+        """Return a list of matching nodes (list may be empty)."""
+        return self._tree._find_all(
+            self._idx,
+            data=data,
+            match=match,
+            data_id=data_id,
+            add_self=add_self,
+            max_results=max_results,
+        )
+
+    def find_first(self, data=None, *, match=None, data_id=None):
+        """Return the first matching node or `None`."""
+        res = self.find_all(data, match=match, data_id=data_id, max_results=1)
+        return res[0] if res else None
+
+    #: Alias for :meth:`find_first`
+    find = find_first
+
+    def format_iter(self, *, repr=None, style=None, add_self=True):
+        """This variant of :meth:`format` returns a line generator."""
+        return self._tree._format_iter(
+            self._idx, repr=repr, style=style, add_self=add_self
+        )
+
+    def format(self, *, repr=None, style=None, add_self=True, join="\n") -> str:
+        """Return a pretty string representation of the node hiererachy.
+
+        See Node's :meth:`~nutree.node.Node.format` method for details.
+        """
+        iter_lines = self.format_iter(repr=repr, style=style, add_self=add_self)
+        return join.join(iter_lines)
+
+    def to_dict(self, *, mapper: MapperCallbackType = None) -> Dict:
+        """Return a nested dict of this node and its children.
+
+        See Node's :meth:`~nutree.node.Node.to_dict` method for details.
+        """
+        return self._tree._to_dict(self._idx, mapper=mapper)
+
+
+# ------------------------------------------------------------------------------
+# - FrozenTree
+# ------------------------------------------------------------------------------
+class FrozenTree:
+    """
+    An immutable, compact copy of a :class:`~nutree.tree.Tree`.
+
+    Structure is stored in pre-order as ``array`` instances (parent,
+    first-child, next-sibling, and depth per node) and the data objects are
+    kept in a single list. :class:`FrozenNode` views are created on demand.
+
+    This supports the read-only part of the :class:`~nutree.tree.Tree` API
+    (iterate, find, format, to_dict, save, ...) at a fraction of the memory.
+    Use :meth:`~nutree.tree.Tree.freeze` to create an instance and
+    :meth:`thaw` to get a mutable :class:`~nutree.tree.Tree` back.
+    """
+
+    #: Default connector prefixes ``format(style=...)`` argument.
+    default_connector_style = "round43"
+
+    def __init__(self, tree: "Tree", *, name: str = None):
+        self.name = tree.name if name is None else str(name)
+        self._calc_data_id_hook = tree._calc_data_id_hook
+
+        parent = array(_IDX_TYPE)
+        first_child = array(_IDX_TYPE)
+        next_sibling = array(_IDX_TYPE)
+        depth = array(_IDX_TYPE)
+        data_list = []
+        #: data_ids are only stored if they differ from the calculated value
+        data_ids = []
+        #: Index of the last node of every depth level (-1 if not yet seen)
+        last_on_level = [-1]
+
+        calc_id = tree._calc_data_id
+        with tree:
+            for idx, node in enumerate(tree.iterator()):
+                d = node._depth
+                p = last_on_level[d - 1] if d > 1 else -1
+                if d < len(last_on_level):
+                    # We already had a node on this level: is it a sibling?
+                    prev = last_on_level[d]
+                    if prev >= 0 and parent[prev] == p:
+                        next_sibling[prev] = idx
+                    del last_on_level[d + 1 :]
+                    last_on_level[d] = idx
+                else:
+                    last_on_level.append(idx)
+                if p >= 0 and first_child[p] < 0:
+                    first_child[p] = idx
+
+                parent.append(p)
+                first_child.append(-1)
+                next_sibling.append(-1)
+                depth.append(d)
+                data = node._data
+                data_list.append(data)
+                data_id = node._data_id
+                data_ids.append(None if data_id == calc_id(data) else data_id)
+
+        self._parent = parent
+        self._first_child = first_child
+        self._next_sibling = next_sibling
+        self._depth = depth
+        self._data = data_list
+        self._data_ids = data_ids if any(di is not None for di in data_ids) else None
+        #: Map data_id -> list of node indexes (created on demand)
+        self._idx_by_data_id = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}<{self.name!r}>"
+
+    def __len__(self):
+        """Make ``len(tree)`` return the number of nodes
+        (also makes empty trees falsy)."""
+        return len(self._data)
+
+    def __contains__(self, data):
+        """Implement ``data in tree`` syntax to check for node existence."""
+        return bool(self.find_first(data))
+
+    def __enter__(self):
+        """Implement ``with tree: ...`` syntax (no locking required)."""
+        return self
+
+    def __exit__(self, type, value, traceback):
+        return
+
+    def __eq__(self, other) -> bool:
+        raise NotImplementedError("Use `is` or `tree.compare()` instead.")
+
+    def __getitem__(self, data: object) -> "FrozenNode":
+        """Implement ``tree[data]`` syntax to lookup a node.
+
+        See Tree's :meth:`~nutree.tree.Tree.__getitem__` method for details.
+        """
+        if isinstance(data, (Node, FrozenNode)):
+            raise ValueError(f"Expected data instance or data_id: {data}")
+
+        # Treat data as data_id
+        if type(data) in (int, str) and self._get_indexes_by_data_id(data):
+            res = self.find_all(data_id=data)
+        else:
+            res = self.find_all(data)
+
+        if not res:
+            raise KeyError(f"{data!r}")
+        elif len(res) > 1:
+            raise AmbiguousMatchError(
+                f"{data!r} has {len(res)} occurrences. "
+                "Use tree.find_all() or tree.find_first() to resolve this."
+            )
+        return res[0]
+
+    def _calc_data_id(self, data) -> ItemIdType:
+        """Called internally to calculate `data_id` for a `data` object.
+
+        See Tree's :meth:`~nutree.tree.Tree._calc_data_id` method for details.
+        """
+        if self._calc_data_id_hook:
+            return self._calc_data_id_hook(self, data)
+        return hash(data)
+
+    def _get_data_id(self, idx: int) -> ItemIdType:
+        data_ids = self._data_ids
+        if data_ids is None or data_ids[idx] is None:
+            return self._calc_data_id(self._data[idx])
+        return data_ids[idx]
+
+    def _get_indexes_by_data_id(self, data_id: ItemIdType) -> List[int]:
+        """Return list of node indexes that reference `data_id` (may be empty)."""
+        index = self._idx_by_data_id
+        if index is None:
+            index = {}
+            for idx in range(len(self._data)):
+                index.setdefault(self._get_data_id(idx), []).append(idx)
+            self._idx_by_data_id = index
+        return index.get(data_id, [])
+
+    def _view(self, idx: int) -> Union[FrozenNode, None]:
+        return None if idx < 0 else FrozenNode(self, idx)
+
+    def _iter_child_idx(self, idx: int) -> Generator[int, None, None]:
+        """Yield indexes of the direct children of `idx` (-1: toplevel nodes)."""
+        if idx < 0:
+            i = 0 if self._data else -1
+        else:
+            i = self._first_child[idx]
+        ns = self._next_sibling
+        while i >= 0:
+            yield i
+            i = ns[i]
+        return
+
+    def _branch_end(self, idx: int) -> int:
+        """Return the index after the last descendant of `idx`.
+
+        In pre-order, a node and its descendants occupy the contiguous
+        range ``[idx, _branch_end(idx))``.
+        """
+        if idx < 0:
+            return len(self._data)
+        ns = self._next_sibling
+        parent = self._parent
+        while idx >= 0:
+            if ns[idx] >= 0:
+                return ns[idx]
+            idx = parent[idx]
+        return len(self._data)
+
+    def _iter_branch_idx(
+        self, idx: int, *, method=IterMethod.PRE_ORDER, add_self=False
+    ) -> Generator[int, None, None]:
+        """Yield indexes of all descendants of `idx` (-1: all nodes)."""
+        add_self = add_self and idx >= 0
+        start = idx + 1
+        end = self._branch_end(idx)
+
+        if method == IterMethod.PRE_ORDER:
+            yield from range(idx if add_self else start, end)
+
+        elif method == IterMethod.POST_ORDER:
+            # Pending ancestors are yielded when we leave their branch
+            depth = self._depth
+            stack = [idx] if add_self else []
+            for i in range(start, end):
+                d = depth[i]
+                while stack and depth[stack[-1]] >= d:
+                    yield stack.pop()
+                stack.append(i)
+            while stack:
+                yield stack.pop()
+
+        elif method == IterMethod.LEVEL_ORDER:
+            if add_self:
+                yield idx
+            level = list(self._iter_child_idx(idx))
+            while level:
+                next_level = []
+                for i in level:
+                    yield i
+                    next_level.extend(self._iter_child_idx(i))
+                level = next_level
+
+        elif method == IterMethod.RANDOM_ORDER:
+            indexes = list(range(idx if add_self else start, end))
+            random.shuffle(indexes)
+            yield from indexes
+
+        elif method == IterMethod.UNORDERED:
+            yield from range(idx if add_self else start, end)
+
+        else:
+            raise NotImplementedError(f"Unsupported traversal method {method!r}.")
+
+    def _find_all(
+        self, idx, *, data=None, match=None, data_id=None, add_self, max_results
+    ) -> List[FrozenNode]:
+        if data is not None:
+            assert data_id is None
+            data_id = self._calc_data_id(data)
+
+        if data_id is not None:
+            assert match is None
+            start = idx if add_self and idx >= 0 else idx + 1
+            end = self._branch_end(idx)
+            res = [
+                FrozenNode(self, i)
+                for i in self._get_indexes_by_data_id(data_id)
+                if start <= i < end
+            ]
+            return res[:max_results] if max_results else res
+
+        if match is None:
+            raise NotImplementedError
+
+        cb_match = make_match_callback(match)
+        res = []
+        for i in self._iter_branch_idx(idx, add_self=add_self):
+            node = FrozenNode(self, i)
+            if cb_match(node):
+                res.append(node)
+                if max_results and len(res) >= max_results:
+                    break
+        return res
+
+    def _format_iter(self, idx: int, *, repr=None, style=None, add_self=True):
+        if repr is None:
+            repr = FrozenNode.DEFAULT_RENDER_REPR
+
+        if style == "list":
+            for i in self._iter_branch_idx(idx, add_self=add_self):
+                n = FrozenNode(self, i)
+                yield repr(n) if callable(repr) else repr.format(node=n)
+            return
+
+        if type(style) not in (list, tuple):
+            try:
+                style = CONNECTORS[style or self.default_connector_style]
+            except KeyError:
+                raise ValueError(
+                    f"Invalid style {style!r}. Expected: {'|'.join(CONNECTORS.keys())}"
+                )
+        s0, s1, s2, s3 = style
+
+        # Same rules as Node._render_lines(): levels up to `lstrip` are
+        # rendered without connector prefix.
+        # `indents[d]` is the prefix contributed by ancestors for level d + 1.
+        base_depth = 0 if idx < 0 else self._depth[idx]
+        lstrip = base_depth if add_self else base_depth + 1
+        if idx < 0:
+            add_self = False
+        indents = {}
+        depth = self._depth
+        ns = self._next_sibling
+        for i in self._iter_branch_idx(idx, add_self=add_self):
+            d = depth[i]
+            indent = indents.get(d - 1, "")
+            n = FrozenNode(self, i)
+            s = repr(n) if callable(repr) else repr.format(node=n)
+            if d > lstrip:
+                is_last = ns[i] < 0
+                yield indent + (s2 if is_last else s3) + s
+                indents[d] = indent + (s0 if is_last else s1)
+            else:
+                yield indent + s
+                indents[d] = indent
+        return
+
+    def _to_dict(self, idx: int, *, mapper: MapperCallbackType = None) -> Dict:
+        def _to_dict(i: int) -> Dict:
+            res = {
+                "data": str(self._data[i]),
+            }
+            # Add custom data_id if any
+            data_ids = self._data_ids
+            if data_ids is not None and data_ids[i] is not None:
+                res["data_id"] = self._calc_data_id(self._data[i])
+            return call_mapper(mapper, FrozenNode(self, i), res)
+
+        # Pre-order: the dict of a node's parent was always created before
+        res = _to_dict(idx)
+        dict_by_idx = {idx: res}
+        parent = self._parent
+        for i in range(idx + 1, self._branch_end(idx)):
+            d = dict_by_idx[i] = _to_dict(i)
+            parent_dict = dict_by_idx[parent[i]]
+            parent_dict.setdefault("children", []).append(d)
+        return res
+
+    @property
+    def children(self) -> List[FrozenNode]:
+        """Return list of direct child nodes, i.e. toplevel nodes
+        (list may be empty)."""
+        return [FrozenNode(self, i) for i in self._iter_child_idx(-1)]
+
+    @property
+    def count(self):
+        """Return the total number of nodes."""
+        return len(self._data)
+
+    @property
+    def count_unique(self):
+        """Return the total number of `unique` nodes."""
+        self._get_indexes_by_data_id(None)
+        return len(self._idx_by_data_id)
+
+    def first_child(self) -> Union[FrozenNode, None]:
+        """Return the first toplevel node."""
+        return self._view(0 if self._data else -1)
+
+    def last_child(self) -> Union[FrozenNode, None]:
+        """Return the last toplevel node."""
+        last = -1
+        for last in self._iter_child_idx(-1):
+            pass
+        return self._view(last)
+
+    def get_random_node(self) -> FrozenNode:
+        """Return a random node."""
+        return FrozenNode(self, random.randrange(len(self._data)))
+
+    def calc_height(self) -> int:
+        """Return the maximum depth of all nodes."""
+        return max(self._depth) if self._data else 0
+
+    def iterator(self, method: IterMethod = IterMethod.PRE_ORDER):
+        """Traverse tree structure and yield nodes.
+
+        See Node's :meth:`~nutree.node.Node.iterator` method for details.
+        """
+        return (FrozenNode(self, i) for i in self._iter_branch_idx(-1, method=method))
+
+    #: Implement ``for node in tree: ...`` syntax to iterate nodes depth-first.
+    __iter__ = iterator
+
+    def format_iter(self, *, repr=None, style=None, title=None):
+        """This variant of :meth:`format` returns a line generator."""
+        if title is None:
+            title = False if style == "list" else True
+        if title:
+            yield f"{self}" if title is True else f"{title}"
+        has_title = title is not False
+        yield from self._format_iter(-1, repr=repr, style=style, add_self=has_title)
+
+    def format(self, *, repr=None, style=None, title=None, join="\n"):
+        """Return a pretty string representation of the tree hiererachy.
+
+        See Node's :meth:`~nutree.node.Node.format` method for details.
+        """
+        lines_iter = self.format_iter(repr=repr, style=style, title=title)
+        return join.join(lines_iter)
+
+    def print(self, *, repr=None, style=None, title=None, join="\n"):
+        """Convenience method that simply runs print(self. :meth:`format()`)."""
+        print(self.format(repr=repr, style=style, title=title, join=join))
+
+    def find_all(
+        self, data=None, *, match=None, data_id=None, max_results: int = None
+    ) -> List[FrozenNode]:
+        """Return a list of matching nodes (list may be empty).
+
+        See also Tree's :meth:`~nutree.tree.Tree.find_all` method.
+        """
+        return self._find_all(
+            -1,
+            data=data,
+            match=match,
+            data_id=data_id,
+            add_self=False,
+            max_results=max_results,
+        )
+
+    def find_first(
+        self, data=None, *, match=None, data_id=None
+    ) -> Union[FrozenNode, None]:
+        """Return the one matching node or `None`.
+
+        See also Tree's :meth:`~nutree.tree.Tree.find_first` method.
+        """
+        res = self.find_all(data, match=match, data_id=data_id, max_results=1)
+        return res[0] if res else None
+
+    #: Alias for :meth:`find_first`
+    find = find_first
+
+    def to_dict(self, *, mapper: MapperCallbackType = None) -> List[Dict]:
+        """Return a list of nested dicts of all toplevel nodes.
+
+        See Tree's :meth:`~nutree.tree.Tree.to_dict` method for details.
+        """
+        return [self._to_dict(i, mapper=mapper) for i in self._iter_child_idx(-1)]
+
+    def to_list_iter(
+        self, *, mapper: MapperCallbackType = None
+    ) -> Generator[Dict, None, None]:
+        """Yield a parent-referencing list of nodes.
+
+        This is the same format as Tree's :meth:`~nutree.tree.Tree.to_list_iter`.
+        """
+        calc_id = self._calc_data_id
+        parent = self._parent
+        data_ids = self._data_ids
+        #: For nodes with multiple occurrences: index of the first one
+        clone_idx_map = {}
+
+        for idx, data in enumerate(self._data):
+            # The file format uses 1-based indexes, 0 is the system root
+            parent_idx = parent[idx] + 1
+            data_id = calc_id(data)
+            node_data_id = data_id if data_ids is None else self._get_data_id(idx)
+
+            clone_idx = clone_idx_map.get(data_id)
+            if clone_idx:
+                yield (parent_idx, clone_idx)
+                continue
+            elif len(self._get_indexes_by_data_id(node_data_id)) > 1:
+                clone_idx_map[data_id] = idx + 1
+
+            if type(data) is str:
+                if data_id != node_data_id:
+                    data = {
+                        "str": data,
+                        "id": data_id,
+                    }
+            else:
+                data = {}
+            data = call_mapper(mapper, FrozenNode(self, idx), data)
+
+            yield (parent_idx, data)
+        return
+
+    def save(self, fp: IO[str], *, mapper: MapperCallbackType = None) -> None:
+        """Store tree in a compact JSON file stream.
+
+        The result can be read with Tree's :meth:`~nutree.tree.Tree.load`.
+        Records are encoded and written in chunks, like
+        :meth:`~nutree.tree.Tree.save` does.
+        """
+        from .tree import _write_json_list
+
+        _write_json_list(fp, self.to_list_iter(mapper=mapper))
+        return
+
+    def thaw(self, *, name: str = None) -> "Tree":
+        """Return a new, mutable :class:`~nutree.tree.Tree` instance."""
+        from .tree import Tree
+
+        return Tree.from_parent_indices(
+            self._data,
+            self._parent,
+            self._data_ids,
+            name=self.name if name is None else name,
+            calc_data_id=self._calc_data_id_hook,
+        )
@@ -0,0 +1,365 @@
+# (c) 2021-2023 Martin Wendt and contributors; see https://github.com/mar10/nutree
+# Licensed under the MIT license: https://www.opensource.org/licenses/mit-license.php
+"""
+Optional secondary indexes that are maintained by :class:`~nutree.tree.Tree`.
+"""
+import bisect
+import math
+import re
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Union
+
+if TYPE_CHECKING:  # Imported by type checkers, but prevent circular includes
+    from .node import Node
+
+#: Inline flags that change how literals are matched, e.g. ``(?i)``
+_INLINE_FLAGS = re.compile(r"\(\?[aiLmsux-]*[ix]")
+#: Flags that change how literals are matched
+_UNSUPPORTED_FLAGS = re.IGNORECASE | re.VERBOSE
+#: Escapes that match a character class or are zero-width, e.g. `\d`, `\b`
+_CLASS_ESCAPES = "dDwWsSbBAZ"
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Return the index after the character class that starts at `pattern[i]`."""
+    i += 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """Return the index after the group that starts at `pattern[i]`."""
+    level = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        elif c == "[":
+            i = _skip_class(pattern, i)
+            continue
+        elif c == "(":
+            level += 1
+        elif c == ")":
+            level -= 1
+            if level == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def required_literals(pattern: str, flags: int = 0) -> Union[List[str], None]:
+    """Return a list of literal strings that every full match of `pattern` contains.
+
+    This is conservative: groups, character classes, and optional parts are
+    skipped. Return None if the pattern cannot be analyzed, e.g. if it
+    contains a toplevel alternation (``|``), case-insensitive flags, or
+    escapes other than character classes (like ``\\x41`` or backreferences).
+    """
+    if flags & _UNSUPPORTED_FLAGS or _INLINE_FLAGS.search(pattern):
+        return None
+    res = []
+    run = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "|":
+            return None
+        elif c in "*?{":
+            # The previous literal is optional (e.g. `x*`, `x?`, `x{0,2}`)
+            if run:
+                run.pop()
+            res.append("".join(run))
+            run = []
+            if c == "{":
+                while i < len(pattern) and pattern[i] != "}":
+                    i += 1
+        elif c == "+":
+            # The previous literal is required, but may be repeated
+            res.append("".join(run))
+            run = []
+        elif c == "\\":
+            nc = pattern[i + 1 : i + 2]
+            if nc and not nc.isalnum():
+                run.append(nc)  # Escaped literal, e.g. `\.`
+            elif nc and nc in _CLASS_ESCAPES:  # Special sequence, e.g. `\d`
+                res.append("".join(run))
+                run = []
+            else:
+                # Character escapes (e.g. `\x41`, `\u00e9`, `\N{...}`, `\n`),
+                # octal escapes, or backreferences: we don't parse these
+                return None
+            i += 2
+            continue
+        elif c in ".^$[(":
+            res.append("".join(run))
+            run = []
+            if c == "[":
+                i = _skip_class(pattern, i)
+                continue
+            elif c == "(":
+                i = _skip_group(pattern, i)
+                continue
+        else:
+            run.append(c)
+        i += 1
+    res.append("".join(run))
+    return [s for s in res if s]
+
+
+class NameIndex:
+    """Trigram index over node names (i.e. ``str(node.data)``).
+
+    Used by :meth:`~nutree.node.Node.find_all` and
+    :meth:`~nutree.node.Node.find_first` to narrow down the candidates for
+    ``match="regex"`` queries, before the regular expression is evaluated.
+    Enable it by passing ``Tree(..., name_index=True)``.
+    """
+
+    #: Length of the n-grams
+    N = 3
+
+    def __init__(self) -> None:
+        #: Map node_id -> indexed name (we need it to remove postings)
+        self._names: Dict[int, str] = {}
+        #: Map n-gram -> {node_id: node}, in insertion order
+        self._postings: Dict[str, Dict[int, Node]] = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def _ngrams(self, s: str) -> set:
+        n = self.N
+        return {s[i : i + n] for i in range(len(s) - n + 1)}
+
+    def add(self, node: "Node") -> None:
+        name = node.name
+        node_id = node._node_id
+        self._names[node_id] = name
+        postings = self._postings
+        for g in self._ngrams(name):
+            try:
+                postings[g][node_id] = node
+            except KeyError:
+                postings[g] = {node_id: node}
+        return
+
+    def remove(self, node: "Node") -> None:
+        node_id = node._node_id
+        name = self._names.pop(node_id)
+        postings = self._postings
+        for g in self._ngrams(name):
+            p = postings[g]
+            del p[node_id]
+            if not p:
+                del postings[g]
+        return
+
+    def add_many(self, nodes: Iterable["Node"]) -> None:
+        for node in nodes:
+            self.add(node)
+
+    def clear(self) -> None:
+        self._names.clear()
+        self._postings.clear()
+
+    def get_candidates(self, match) -> Union[List["Node"], None]:
+        """Return all nodes that may match the `match` argument of `find_all()`.
+
+        Return None if the index cannot narrow down the search, so all nodes
+        must be checked.
+        """
+        if type(match) is str:
+            literals = required_literals(match)
+        elif isinstance(match, (list, tuple)):
+            literals = required_literals(match[0], match[1])
+        else:
+            return None
+        if not literals:
+            return None
+
+        ngrams = set()
+        for s in literals:
+            ngrams.update(self._ngrams(s))
+        if not ngrams:
+            return None  # All literals are shorter than N
+
+        postings = []
+        for g in ngrams:
+            p = self._postings.get(g)
+            if not p:
+                return []
+            postings.append(p)
+        postings.sort(key=len)
+        smallest, others = postings[0], postings[1:]
+        return [
+            n for node_id, n in smallest.items() if all(node_id in p for p in others)
+        ]
+
+
+class HashIndex:
+    """Map ``key(node)`` values to nodes for O(1) equality lookups.
+
+    Nodes for which `key` returns None are not indexed.
+    See :meth:`~nutree.tree.Tree.add_index` and
+    :meth:`~nutree.tree.Tree.find_by`.
+    """
+
+    def __init__(self, key: Callable[["Node"], Any]) -> None:
+        self.key = key
+        #: Map node_id -> indexed key (we need it to remove stale entries)
+        self._keys: Dict[int, Any] = {}
+        #: Map key -> {node_id: node}, in insertion order
+        self._nodes: Dict[Any, Dict[int, Node]] = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, node: "Node") -> None:
+        value = self.key(node)
+        node_id = node._node_id
+        if value is not None:
+            # Raises TypeError for unhashable keys, so do this first
+            try:
+                self._nodes[value][node_id] = node
+            except KeyError:
+                self._nodes[value] = {node_id: node}
+        self._keys[node_id] = value
+        return
+
+    def remove(self, node: "Node") -> None:
+        node_id = node._node_id
+        value = self._keys.pop(node_id)
+        if value is None:
+            return
+        nodes = self._nodes[value]
+        del nodes[node_id]
+        if not nodes:
+            del self._nodes[value]
+        return
+
+    def add_many(self, nodes: Iterable["Node"]) -> None:
+        for node in nodes:
+            self.add(node)
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._nodes.clear()
+
+    def get(self, value) -> List["Node"]:
+        """Return a list of all nodes with ``key(node) == value``."""
+        nodes = self._nodes.get(value)
+        return list(nodes.values()) if nodes else []
+
+
+class SortedIndex:
+    """Keep ``key(node)`` values sorted, for range, top-k, and min/max queries.
+
+    Keys are maintained in a sorted list using :mod:`bisect`, so lookups are
+    O(log n + k). Inserting and removing is O(log n) plus a fast memmove.
+    Nodes for which `key` returns None are not indexed.
+    See :meth:`~nutree.tree.Tree.add_index` and
+    :meth:`~nutree.tree.Tree.find_range`.
+    """
+
+    def __init__(self, key: Callable[["Node"], Any]) -> None:
+        self.key = key
+        #: Map node_id -> `(key, seq)` entry (we need it to remove the node)
+        self._entries: Dict[int, Union[tuple, None]] = {}
+        #: Sorted list of `(key, seq)` entries. `seq` is a unique insertion
+        #: counter, so equal keys keep insertion order and nodes are never
+        #: compared
+        self._sorted: List[tuple] = []
+        #: Map seq -> node
+        self._nodes: Dict[int, Node] = {}
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, node: "Node") -> None:
+        value = self.key(node)
+        if value is None:
+            self._entries[node._node_id] = None
+            return
+        entry = (value, self._seq + 1)
+        # Raises TypeError if keys are not comparable, so do this first
+        bisect.insort(self._sorted, entry)
+        self._seq += 1
+        self._entries[node._node_id] = entry
+        self._nodes[self._seq] = node
+        return
+
+    def add_many(self, nodes: Iterable["Node"]) -> None:
+        """Add multiple nodes and sort once (faster than calling `add()`)."""
+        key = self.key
+        seq = self._seq
+        new_entries = []
+        for node in nodes:
+            value = key(node)
+            if value is None:
+                new_entries.append((node, None))
+                continue
+            seq += 1
+            new_entries.append((node, (value, seq)))
+        added = [entry for _, entry in new_entries if entry is not None]
+        if added:
+            # Raises TypeError if keys are not comparable, so do this first
+            merged = self._sorted + added
+            merged.sort()
+            self._sorted = merged
+        self._seq = seq
+        entries = self._entries
+        nodes_by_seq = self._nodes
+        for node, entry in new_entries:
+            entries[node._node_id] = entry
+            if entry is not None:
+                nodes_by_seq[entry[1]] = node
+        return
+
+    def remove(self, node: "Node") -> None:
+        entry = self._entries.pop(node._node_id)
+        if entry is None:
+            return
+        del self._sorted[bisect.bisect_left(self._sorted, entry)]
+        del self._nodes[entry[1]]
+        return
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._sorted.clear()
+        self._nodes.clear()
+
+    def get(self, value) -> List["Node"]:
+        """Return a list of all nodes with ``key(node) == value``."""
+        if value is None:
+            return []  # Not indexed (and would be an open range)
+        return self.range(value, value)
+
+    def range(
+        self, low=None, high=None, *, reverse=False, max_results=None
+    ) -> List["Node"]:
+        """Return nodes with ``low <= key(node) <= high``, ordered by key.
+
+        `low` and `high` may be None for open ranges.
+        """
+        entries = self._sorted
+        start = 0 if low is None else bisect.bisect_left(entries, (low,))
+        if high is None:
+            stop = len(entries)
+        else:
+            stop = bisect.bisect_right(entries, (high, math.inf))
+        if max_results and stop - start > max_results:
+            if reverse:
+                start = stop - max_results
+            else:
+                stop = start + max_results
+        nodes = self._nodes
+        res = [nodes[seq] for _, seq in entries[start:stop]]
+        if reverse:
+            res.reverse()
+        return res
@@ -3,9 +3,18 @@
 """
 Declare the :class:`~nutree.node.Node` class.
 """
-import re
+import hashlib
 from operator import attrgetter
-from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Union,
+)
 
 if TYPE_CHECKING:  # Imported by type checkers, but prevent circular includes
     from .tree import Tree
@@ -25,6 +34,7 @@ from .common import (
     call_mapper,
     call_predicate,
     call_traversal_cb,
+    make_match_callback,
 )
 from .dot import node_to_dot
 from .rdf import RDFMapperCallbackType, node_to_rdf
@@ -46,10 +56,13 @@ class Node:
         "_children",
         "_data_id",
         "_data",
+        "_depth",
+        "_idx_hint",
         "_meta",
         "_node_id",
         "_parent",
         "_tree",
+        "_tree_pos",
     )
     #: Default value for ``repr`` argument when formatting data for print/display.
     DEFAULT_RENDER_REPR = "{node.data!r}"
@@ -74,6 +87,7 @@ class Node:
         tree = parent._tree
         self._tree: "Tree" = tree
         self._children: List[Node] = None
+        self._depth: int = parent._depth + 1
 
         if data_id is None:
             self._data_id: ItemIdType = tree._calc_data_id(data)
@@ -86,6 +100,8 @@ class Node:
             self._node_id = node_id
 
         self._meta = meta
+        #: Last known position in the parent's child list (see `_sibling_index()`)
+        self._idx_hint: int = 0
 
         tree._register(self)
 
@@ -182,21 +198,25 @@ class Node:
         """Set metadata value (pass value `None` to remove)."""
         if value is None:
             self.clear_meta(key)
+            return
         elif self._meta is None:
             self._meta = {key: value}
         else:
             self._meta[key] = value
+        self._meta_changed()
 
     def clear_meta(self, key: str = None):
         """Reset all metadata or a distinct entry."""
         if key is None:
             self._meta = None
+            self._meta_changed()
             return
         m = self._meta
         if m is not None:
             m.pop(key, None)
             if len(m) == 0:
                 self._meta = None
+            self._meta_changed()
         return
 
     def update_meta(self, values: dict, *, replace: bool = False):
@@ -208,6 +228,12 @@ class Node:
             self._meta = values.copy()
         else:
             self._meta.update(values)
+        self._meta_changed()
+
+    def _meta_changed(self) -> None:
+        tree = self._tree
+        if tree is not None and tree._fingerprints:
+            tree._discard_fingerprints(self)
 
     def rename(self, new_name: str) -> None:
         """Set `self.data` to a new string (assuming plain string node)."""
@@ -243,6 +269,23 @@ class Node:
                 "set_data() for clones requires `with_clones` decision"
             )
 
+        # Secondary indexes and path maps depend on data, so update them
+        # before anything is changed (index keys may raise)
+        child_index = tree._child_index if new_data_id else None
+        if tree._all_indexes or tree._path_maps or child_index is not None:
+            changed = list(cur_nodes.values()) if with_clones else [self]
+            if child_index is not None:
+                prev_data_id = self._data_id
+                for n in changed:
+                    tree._check_child_index(n._parent, new_data_id)
+            if tree._all_indexes:
+                tree._update_index_entries(changed, new_data, new_data_id)
+            for n in changed:
+                tree._discard_path_maps(n._parent)
+        if new_data_id and tree._fingerprints:
+            for n in cur_nodes.values() if with_clones else [self]:
+                tree._discard_fingerprints(n)
+
         if new_data_id:
             # data_id (and possibly data) changes: we have to update the map
             if has_clones:
@@ -251,20 +294,20 @@ class Node:
                     prev_clones = node_map[self._data_id]
                     del node_map[self._data_id]
                     try:  # are we adding to existing clones now?
-                        node_map[new_data_id].extend(prev_clones)
+                        node_map[new_data_id].update(prev_clones)
                     except KeyError:  # still a singleton, just a new data_id
                         node_map[new_data_id] = prev_clones
-                    for n in prev_clones:
+                    for n in prev_clones.values():
                         n._data_id = new_data_id
                         if new_data:
                             n._data = new_data
                 else:
                     # Move this one node to another slot in the map
-                    node_map[self._data_id].remove(self)
+                    del node_map[self._data_id][self._node_id]
                     try:  # are we adding to existing clones again?
-                        node_map[new_data_id].append(self)
+                        node_map[new_data_id][self._node_id] = self
                     except KeyError:  # now a singleton with a new data_id
-                        node_map[new_data_id] = [self]
+                        node_map[new_data_id] = {self._node_id: self}
                     self._data_id = new_data_id
                     if new_data:
                         self._data = new_data
@@ -272,9 +315,9 @@ class Node:
                 # data_id (and possibly data) changed for a *single* node
                 del node_map[self._data_id]
                 try:  # are we creating a clone now?
-                    node_map[new_data_id].append(self)
+                    node_map[new_data_id][self._node_id] = self
                 except KeyError:  # still a singleton, just a new data_id
-                    node_map[new_data_id] = [self]
+                    node_map[new_data_id] = {self._node_id: self}
                 self._data_id = new_data_id
                 if new_data:
                     self._data = new_data
@@ -282,13 +325,34 @@ class Node:
             # `data` changed, but `data_id` remains the same:
             # simply replace the reference
             if with_clones:
-                for n in cur_nodes:
+                for n in cur_nodes.values():
                     n._data = data
             else:
                 self._data = new_data
 
+        if child_index is not None:
+            for n in changed:
+                tree._remove_from_child_index(n, n._parent, prev_data_id)
+                tree._add_to_child_index(n, n._parent)
         return
 
+    def get_child(self, data=None, *, data_id=None) -> Union["Node", None]:
+        """Return the direct child that references `data` or `data_id` (or None).
+
+        This is O(1) if the tree was created with ``child_index=True``,
+        otherwise the children are scanned.
+        """
+        tree = self._tree
+        if data_id is None:
+            data_id = tree._calc_data_id(data)
+        if tree._child_index is not None:
+            siblings = tree._child_index.get(self._node_id)
+            return siblings.get(data_id) if siblings else None
+        for c in self._children or ():
+            if c._data_id == data_id:
+                return c
+        return None
+
     def get_children(self) -> List["Node"]:
         """Return list of direct child nodes (list may be empty)."""
         return self.children
@@ -315,14 +379,14 @@ class Node:
         """Predecessor or None, if node is first sibling."""
         if self.is_first_sibling():
             return None
-        idx = self._parent._children.index(self)
+        idx = self._sibling_index()
         return self._parent._children[idx - 1]
 
     def next_sibling(self) -> Union["Node", None]:
         """Return successor or None, if node is last sibling."""
         if self.is_last_sibling():
             return None
-        idx = self._parent._children.index(self)
+        idx = self._sibling_index()
         return self._parent._children[idx + 1]
 
     def last_sibling(self) -> "Node":
@@ -333,15 +397,22 @@ class Node:
         """Return a list of all nodes that reference the same data if any."""
         clones = self._tree._nodes_by_data_id[self._data_id]
         if add_self:
-            return clones.copy()
-        return [n for n in clones if n is not self]
+            return list(clones.values())
+        return [n for n in clones.values() if n is not self]
 
     def depth(self) -> int:
         """Return the distance to the root node (1 for toplevel nodes)."""
-        return self.calc_depth()
+        return self._depth
 
     def count_descendants(self, *, leaves_only=False) -> int:
-        """Return number of descendant nodes, not counting self."""
+        """Return number of descendant nodes, not counting self.
+
+        This is O(1) if the tree was created with ``track_counts=True``.
+        """
+        counts = self._tree._subtree_counts
+        if counts is not None:
+            return counts[self._node_id][1 if leaves_only else 0]
+
         all = not leaves_only
         i = 0
         for node in self.iterator():
@@ -350,33 +421,81 @@ class Node:
         return i
 
     def calc_depth(self) -> int:
-        """Return the distance to the root node (1 for toplevel nodes)."""
-        depth = 0
-        pe = self._parent
-        while pe is not None:
-            depth += 1
-            pe = pe._parent
-        return depth
+        """Return the distance to the root node (1 for toplevel nodes).
+
+        The depth is maintained when nodes are added or moved, so this is the
+        same as :meth:`depth`.
+        """
+        return self._depth
 
     def calc_height(self) -> int:
         """Return the maximum depth of all descendants (0 for leaves)."""
-        height = 0
-
-        def _ch(n, h):
-            nonlocal height
-            c = n._children
-            if c:
-                for n in c:
-                    _ch(n, h + 1)
-            elif h > height:
-                height = h
-
-        _ch(self, 0)
-        return height
+        max_depth = self._depth
+        for n in self._iter_pre():
+            if n._depth > max_depth:
+                max_depth = n._depth
+        return max_depth - self._depth
+
+    def fingerprint(self, *, with_meta=False) -> str:
+        """Return a hash over the data_ids and child order of this branch.
+
+        Fingerprints are computed bottom-up (like a Merkle tree) and cached
+        per node. Adding, removing, moving, or sorting nodes and
+        :meth:`set_data` only discard the cached values of the affected
+        ancestors, so checking a branch for changes is cheap after edits.
+
+        If `with_meta` is true, metadata is included as well.
+        Note that fingerprints depend on data_ids, so they are only stable
+        between processes if the data_ids are (e.g. not for ``hash(str)``).
+        """
+        cache = self._tree._get_fingerprints(with_meta)
+        return self._calc_fingerprint(cache, with_meta).hex()
+
+    def _calc_fingerprint(self, cache: Dict, with_meta=False) -> bytes:
+        fp = cache.get(self._node_id)
+        if fp is not None:
+            return fp
+        # Non-recursive, post-order: skip branches that are already cached
+        stack = [(self, iter(self._children or ()))]
+        while stack:
+            node, children = stack[-1]
+            for c in children:
+                if c._node_id not in cache:
+                    stack.append((c, iter(c._children or ())))
+                    break
+            else:
+                stack.pop()
+                h = hashlib.blake2b(repr(node._data_id).encode(), digest_size=16)
+                if with_meta and node._meta:
+                    h.update(b"\0" + repr(sorted(node._meta.items())).encode())
+                h.update(b"\1")
+                for c in node._children or ():
+                    h.update(cache[c._node_id])
+                cache[node._node_id] = h.digest()
+        return cache[self._node_id]
 
     def get_index(self) -> int:
         """Return index in sibling list."""
-        return self._parent._children.index(self)
+        return self._sibling_index()
+
+    def _sibling_index(self) -> int:
+        """Return the position in the parent's child list (compared by identity).
+
+        Every node remembers its last known position. If this hint turned out
+        to be stale (because siblings were inserted, removed, or sorted), the
+        hints of all siblings are refreshed in one pass. So walking a long
+        sibling list costs amortized O(1) per step.
+        """
+        siblings = self._parent._children
+        idx = self._idx_hint
+        if 0 <= idx < len(siblings) and siblings[idx] is self:
+            return idx
+        for i, n in enumerate(siblings):
+            n._idx_hint = i
+        idx = self._idx_hint
+        if not 0 <= idx < len(siblings) or siblings[idx] is not self:
+            raise ValueError(f"{self} is not a child of {self._parent}")
+        return idx
 
     # --------------------------------------------------------------------------
 
@@ -420,12 +539,18 @@ class Node:
 
     def is_descendant_of(self, other: "Node") -> bool:
         """Return true if this node is direct or indirect child of `other`."""
+        if other._parent is None:  # The system root is not a real ancestor
+            return False
+        # We only have to walk up to the level of `other`
+        ofs = self._depth - other._depth
+        if ofs <= 0:
+            return False
         parent = self._parent
-        while parent is not None and parent._parent is not None:
-            if parent is other:
-                return True
+        for _ in range(ofs - 1):
+            if parent is None:  # Detached node (removed), depth is stale
+                return False
             parent = parent._parent
-        return False
+        return parent is other
 
     def is_ancestor_of(self, other: "Node") -> bool:
         """Return true if this node is a parent, grandparent, ... of `other`."""
@@ -562,16 +687,22 @@ class Node:
         elif before is True:  # prepend
             children.insert(0, node)
         elif type(before) is int:
-            children.insert(before, node)
+            # Use the real position, e.g. `before=-1` or out of range
+            idx = len(children)
+            idx = max(0, idx + before) if before < 0 else min(before, idx)
+            children.insert(idx, node)
+            node._idx_hint = idx
         elif before:
             if before._parent is not self:
                 raise ValueError(
                     f"`before=node` ({before._parent}) "
                     f"must be a child of target node ({self})"
                 )
-            idx = children.index(before)  # raises ValueError
+            idx = before._sibling_index()  # raises ValueError
             children.insert(idx, node)
+            node._idx_hint = idx
         else:
+            node._idx_hint = len(children)
             children.append(node)
 
         if deep and source_node:
@@ -672,20 +803,54 @@ class Node:
         if new_parent._tree is not self._tree:
             raise NotImplementedError("Can only move nodes inside same tree")
 
-        self._parent._children.remove(self)
+        tree = self._tree
+        if tree._subtree_counts is not None:
+            count, leaves = tree._branch_counts(self)
+        if tree._path_maps:
+            tree._discard_path_maps(self._parent)
+            tree._discard_path_maps(new_parent)
+        if tree._fingerprints:
+            tree._discard_fingerprints(self._parent)
+            tree._discard_fingerprints(new_parent)
+        if tree._child_index is not None and new_parent is not self._parent:
+            tree._check_child_index(new_parent, self._data_id)
+            tree._remove_from_child_index(self, self._parent, self._data_id)
+            tree._add_to_child_index(self, new_parent)
+
+        pc = self._parent._children
+        pc.pop(self._sibling_index())
+        if not pc:  # store None instead of `[]`
+            self._parent._children = None
+
+        if tree._subtree_counts is not None:
+            tree._add_counts(self._parent, -count, -leaves, 0 if pc else 1)
+            tree._add_counts(
+                new_parent, count, leaves, 0 if new_parent._children else -1
+            )
+
         self._parent = new_parent
 
+        ofs = new_parent._depth + 1 - self._depth
+        if ofs:
+            self._depth += ofs
+            for n in self._iter_pre():
+                n._depth += ofs
+
         target_siblings = new_parent._children
         if target_siblings is None:
             assert before in (None, True, False)
             new_parent._children = [self]
+            self._idx_hint = 0
         elif before is True:  # prepend
             target_siblings.insert(0, self)
+            self._idx_hint = 0
         elif before:
             assert before._parent is new_parent
-            idx = target_siblings.index(before)  # raise ValueError if not found
+            idx = before._sibling_index()  # raise ValueError if not found
             target_siblings.insert(idx, self)
+            self._idx_hint = idx
         else:
+            self._idx_hint = len(target_siblings)
             target_siblings.append(self)
         return
 
@@ -710,20 +875,73 @@ class Node:
             self.remove_children()
 
         pc = self._parent._children
-        pc.remove(self)
+        pc.pop(self._sibling_index())
         if not pc:  # store None instead of `[]`
             pc = self._parent._children = None
 
+        if self._tree._subtree_counts is not None:
+            # Self is a leaf now
+            self._tree._add_counts(self._parent, -1, -1, 0 if pc else 1)
+
         self._tree._unregister(self)
 
     def remove_children(self) -> None:
         """Remove all children of this node, making it a leaf node."""
-        _unregister = self._tree._unregister
+        tree = self._tree
+        if tree._subtree_counts is not None and self._children:
+            count, leaves = tree._subtree_counts[self._node_id]
+            tree._add_counts(self, -count, -leaves, 1)
+
+        _unregister = tree._unregister
         for n in self._iter_post():
             _unregister(n)
         self._children = None
         return
 
+    def remove_children_where(self, predicate: Callable[["Node"], bool]) -> int:
+        """Remove all direct children (and their descendants) that match.
+
+        `predicate` is called for every direct child.
+        Unlike calling :meth:`remove` in a loop, the child list is rebuilt
+        only once, which makes this O(n) instead of O(n²).
+        Return the number of removed children.
+        """
+        children = self._children
+        if not children:
+            return 0
+        keep = []
+        removed = []
+        for c in children:
+            if predicate(c):
+                removed.append(c)
+            else:
+                keep.append(c)
+        if removed:
+            self._remove_child_list(keep, removed)
+        return len(removed)
+
+    def _remove_child_list(self, keep: List["Node"], removed: List["Node"]) -> None:
+        """Replace child list by `keep` and unregister the `removed` branches."""
+        tree = self._tree
+        if tree._subtree_counts is not None:
+            count = leaves = 0
+            for n in removed:
+                n_count, n_leaves = tree._branch_counts(n)
+                count += n_count
+                leaves += n_leaves
+            tree._add_counts(self, -count, -leaves, 0 if keep else 1)
+
+        _unregister = tree._unregister
+        for n in removed:
+            for d in n._iter_post():
+                _unregister(d)
+            _unregister(n)
+
+        for i, c in enumerate(keep):
+            c._idx_hint = i
+        self._children = keep or None
+        return
+
     def copy(self, *, add_self=True, predicate: PredicateCallbackType = None) -> "Tree":
         """Return a new :class:`~nutree.tree.Tree` instance from this branch.
 
@@ -777,11 +995,19 @@ class Node:
             return self._add_filtered(other, predicate)
 
         assert not self._children
-        for child in other.children:
-            new_child = self.add_child(child.data, data_id=child._data_id)
-            if child.children:
-                # if child.has_children():
-                new_child._add_from(child, predicate=None)
+        if not other._children:
+            return
+        # Non-recursive, pre-order: stack of `(target_parent, source_iterator)`
+        stack = [(self, iter(other._children))]
+        while stack:
+            parent, source_iter = stack[-1]
+            for child in source_iter:
+                new_child = parent.add_child(child.data, data_id=child._data_id)
+                if child._children:
+                    stack.append((new_child, iter(child._children)))
+                    break
+            else:
+                stack.pop()
         return
 
     def _add_filtered(self, other: "Node", predicate: PredicateCallbackType) -> None:
@@ -807,14 +1033,15 @@ class Node:
                     parent_stack[idx] = (True, p)
             return p
 
-        def _visit(other: Node):
-            """Return True if any descendant returned True."""
-
-            # print("_visit", parent_stack, other)
-            for n in other.children:
+        # Non-recursive: `iter_stack` holds one child iterator per entry of
+        # `parent_stack`
+        iter_stack = [iter(other.children)]
+        while iter_stack:
+            for n in iter_stack[-1]:
                 parent_stack.append((False, n))
 
                 res = call_predicate(predicate, n)
+                visit_children = False
                 if isinstance(res, SkipBranch):
                     if res.and_self is False:
                         # Add the node itself if user explicitly returned
@@ -822,25 +1049,26 @@ class Node:
                         p = _create_parents()
                         p.add_child(n)
                 elif isinstance(res, StopTraversal):
-                    raise res
+                    return
                 elif isinstance(res, SelectBranch):
                     # Unconditionally copy whole branch: no need to visit children
                     p = _create_parents()
                     p._add_from(n)
                 elif res in (None, False):  # Add only if has a `true` descendant
-                    _visit(n)
+                    visit_children = True
                 elif res is True:  # Add this node (and also check children)
                     p = _create_parents()
                     p.add_child(n)
-                    _visit(n)
+                    visit_children = True
 
+                if visit_children and n._children:
+                    iter_stack.append(iter(n._children))
+                    break
                 parent_stack.pop()
-            return
-
-        try:
-            _visit(other)
-        except StopTraversal:
-            pass
+            else:
+                iter_stack.pop()
+                if iter_stack:
+                    parent_stack.pop()
         return
 
     def filtered(self, predicate: PredicateCallbackType) -> "Tree":
@@ -856,38 +1084,49 @@ class Node:
         See also :ref:`iteration callbacks`.
         """
 
-        def _visit(parent: Node) -> bool:
-            """Return True if any descendant returned True."""
-            remove_nodes = []
-            must_keep = None
-
-            for n in parent.children:
-                res = call_predicate(predicate, n)
-                if res in (None, False):  # Keep only if has a `true` descendant
-                    if _visit(n):
-                        must_keep = True
-                    else:
-                        remove_nodes.append(n)
-                elif res is True:  # Keep this node (and also check children)
-                    _visit(n)
-                    must_keep = True
-                elif isinstance(res, SelectBranch):
-                    # Unconditionally keep whole branch: no need to visit children
-                    must_keep = True
-                elif isinstance(res, SkipBranch):
-                    if res.and_self is False:
-                        remove_nodes = n.children
-                    else:
-                        remove_nodes.append(n)
-                elif isinstance(res, StopTraversal):
-                    raise res
-
-            for n in remove_nodes:
-                n.remove()
-            return must_keep
-
+        # Non-recursive: every stack frame is a list
+        # `[parent, child_iterator, remove_nodes, must_keep, keep_if_any]`.
+        # `must_keep` is set if any descendant of `parent` was accepted.
+        # `keep_if_any` is true if `parent` itself is only kept in this case.
+        stack = [[self, iter(self.children), [], False, False]]
         try:
-            _visit(self)
+            while stack:
+                frame = stack[-1]
+                for n in frame[1]:
+                    res = call_predicate(predicate, n)
+                    if res in (None, False):  # Keep only if has a `true` descendant
+                        stack.append([n, iter(n.children), [], False, True])
+                        break
+                    elif res is True:  # Keep this node (and also check children)
+                        frame[3] = True
+                        stack.append([n, iter(n.children), [], False, False])
+                        break
+                    elif isinstance(res, SelectBranch):
+                        # Unconditionally keep whole branch: no need to visit children
+                        frame[3] = True
+                    elif isinstance(res, SkipBranch):
+                        if res.and_self is False:
+                            # Keep the node itself, but drop all descendants
+                            frame[3] = True
+                            n.remove_children()
+                        else:
+                            frame[2].append(n)
+                    elif isinstance(res, StopTraversal):
+                        raise res
+                else:
+                    parent, _, remove_nodes, must_keep, keep_if_any = stack.pop()
+                    if remove_nodes:
+                        # Rebuild the child list once and drop whole branches
+                        remove_ids = {n._node_id for n in remove_nodes}
+                        keep = [
+                            c for c in parent._children if c._node_id not in remove_ids
+                        ]
+                        parent._remove_child_list(keep, remove_nodes)
+                    if stack and keep_if_any:
+                        if must_keep:
+                            stack[-1][3] = True
+                        else:
+                            stack[-1][2].append(parent)
         except StopTraversal:
             pass
         return
@@ -895,44 +1134,67 @@ class Node:
     def from_dict(self, obj: List[Dict], *, mapper=None):
         """Append copies of all source children to self."""
         assert not self._children
-        for item in obj:
-            if mapper:
-                # mapper may add item['data_id']
-                # data = mapper(parent=self, item=item)
-                data = call_mapper(mapper, self, item)
-            else:
-                data = item["data"]
+        # Non-recursive, pre-order: stack of `(parent, item_iterator)`
+        stack = [(self, iter(obj))]
+        while stack:
+            parent, item_iter = stack[-1]
+            for item in item_iter:
+                if mapper:
+                    # mapper may add item['data_id']
+                    # data = mapper(parent=self, item=item)
+                    data = call_mapper(mapper, parent, item)
+                else:
+                    data = item["data"]
 
-            child = self.append_child(
-                data, data_id=item.get("data_id"), node_id=item.get("node_id")
-            )
-            child_items = item.get("children")
-            if child_items:
-                child.from_dict(child_items)
+                child = parent.append_child(
+                    data, data_id=item.get("data_id"), node_id=item.get("node_id")
+                )
+                child_items = item.get("children")
+                if child_items:
+                    stack.append((child, iter(child_items)))
+                    break
+            else:
+                stack.pop()
         return
 
     def _visit_pre(self, callback, memo):
         """Depth-first, pre-order traversal."""
         # Call callback and skip children if SkipBranch was returned.
         # Also a StopTraversal(value) exception may be raised.
+        # Note that this is non-recursive.
         if call_traversal_cb(callback, self, memo) is False:
             return
 
         children = self._children
-        if children:
-            for c in children:
-                c._visit_pre(callback, memo)
+        if not children:
+            return
+        stack = [iter(children)]
+        while stack:
+            for c in stack[-1]:
+                if call_traversal_cb(callback, c, memo) is False:
+                    continue
+                if c._children:
+                    stack.append(iter(c._children))
+                    break
+            else:
+                stack.pop()
         return
 
     def _visit_post(self, callback, memo):
         """Depth-first, post-order traversal."""
         # Callback may raise StopTraversal (also if callback returns false)
         # but SkipBranch is not supported with post-order traversal
-        children = self._children
-        if children:
-            for c in self._children:
-                c._visit_post(callback, memo)
-        call_traversal_cb(callback, self, memo)
+        # Note that this is non-recursive.
+        stack = [(self, iter(self._children or ()))]
+        while stack:
+            for c in stack[-1][1]:
+                if c._children:
+                    stack.append((c, iter(c._children)))
+                    break
+                call_traversal_cb(callback, c, memo)
+            else:
+                call_traversal_cb(callback, stack.pop()[0], memo)
+        return
 
     def _visit_level(self, callback, memo):
         """Breadth-first (aka level-order) traversal."""
@@ -1013,20 +1275,39 @@ class Node:
 
     def _iter_pre(self):
         """Depth-first, pre-order traversal."""
+        # Note that this is non-recursive: we keep a stack of child iterators
         children = self._children
-        if children:
-            for c in children:
+        if not children:
+            return
+        stack = [iter(children)]
+        while stack:
+            for c in stack[-1]:
                 yield c
-                yield from c._iter_pre()
+                if c._children:
+                    stack.append(iter(c._children))
+                    break
+            else:
+                stack.pop()
         return
 
     def _iter_post(self):
         """Depth-first, post-order traversal."""
+        # Note that this is non-recursive: we keep a stack of
+        # `(parent, child_iterator)` tuples
         children = self._children
-        if children:
-            for c in self._children:
-                yield from c._iter_post()
+        if not children:
+            return
+        stack = [(self, iter(children))]
+        while stack:
+            for c in stack[-1][1]:
+                if c._children:
+                    stack.append((c, iter(c._children)))
+                    break
                 yield c
+            else:
+                parent = stack.pop()[0]
+                if stack:
+                    yield parent
         return
 
     def _iter_level(self):
@@ -1062,19 +1343,27 @@ class Node:
     __iter__ = iterator
 
     def _search(self, match, *, max_results=None, add_self=False):
-        if callable(match):
-            cb_match = match
-        elif type(match) is str:
-            pattern = re.compile(pattern=match)
-            cb_match = lambda node: pattern.fullmatch(node.name)  # noqa: E731
-        elif isinstance(match, (list, tuple)):
-            pattern = re.compile(pattern=match[0], flags=match[1])
-            cb_match = lambda node: pattern.fullmatch(node.name)  # noqa: E731
+        cb_match = make_match_callback(match)
+
+        name_index = self._tree._name_index
+        candidates = None
+        if name_index is not None and not callable(match):
+            # Only check nodes that contain the literal parts of the pattern
+            candidates = name_index.get_candidates(match)
+
+        if candidates is None:
+            nodes = self.iterator(add_self=add_self)
+        elif self._parent is None:  # System root: all nodes are descendants
+            nodes = candidates
         else:
-            cb_match = lambda node: node._data is match  # noqa: E731
+            nodes = (
+                n
+                for n in candidates
+                if n.is_descendant_of(self) or (add_self and n is self)
+            )
 
         count = 0
-        for node in self.iterator(add_self=add_self):
+        for node in nodes:
             if not cb_match(node):
                 continue
             count += 1
@@ -1088,16 +1377,32 @@ class Node:
     ):
         """Return a list of matching nodes (list may be empty).
 
+        Lookups by `data` or `data_id` use the tree's index: only the clones
+        of that data are checked for being part of this branch, so the
+        subtree is not scanned. Note that the result is ordered by node
+        creation in this case, which is not neccessarily pre-order.
+        The same applies to ``match="regex"`` lookups if the tree was created
+        with ``name_index=True``.
+
         See also :ref:`iteration callbacks`.
         """
-        if data:
+        if data is not None:
             assert data_id is None
             data_id = self._tree._calc_data_id(data)
-        if data_id:
+        if data_id is not None:
             assert match is None
-            return [
-                n for n in self.iterator(add_self=add_self) if n._data_id == data_id
-            ]
+            clones = self._tree._nodes_by_data_id.get(data_id)
+            if not clones:
+                return []
+            if self._parent is None:  # System root: all nodes are descendants
+                res = list(clones.values())
+            else:
+                res = [
+                    n
+                    for n in clones.values()
+                    if n.is_descendant_of(self) or (add_self and n is self)
+                ]
+            return res[:max_results] if max_results else res
         return [
             n for n in self._search(match, add_self=add_self, max_results=max_results)
         ]
@@ -1125,37 +1430,15 @@ class Node:
         if key is None:
             key = attrgetter("name")
         cl.sort(key=key, reverse=reverse)
+        if self._tree._path_maps:  # The first of equally named children may change
+            self._tree._discard_path_maps(self)
+        if self._tree._fingerprints:
+            self._tree._discard_fingerprints(self)
         if deep:
             for c in cl:
                 c.sort_children(key=key, reverse=reverse, deep=True)
         return
 
-    def _get_prefix(self, style, lstrip):
-        s0, s1, s2, s3 = style
-
-        def _is_last(p):
-            # Don't use `is_last_sibling()` which is overloaded by TypedNode
-            return p is p._parent._children[-1]
-
-        parts = []
-        depth = 0
-        for p in self.get_parent_list():
-            depth += 1
-            if depth <= lstrip:
-                continue
-            if _is_last(p):
-                parts.append(s0)  # "    "
-            else:
-                parts.append(s1)  # " |  "
-
-        if depth >= lstrip:
-            if _is_last(self):
-                parts.append(s2)  # " ╰─ "
-            else:
-                parts.append(s3)  # " ├─ "
-
-        return "".join(parts)
-
     def _render_lines(self, *, repr=None, style=None, add_self=True):
         if type(style) not in (list, tuple):
             try:
@@ -1168,27 +1451,52 @@ class Node:
         if repr is None:
             repr = self.DEFAULT_RENDER_REPR
 
+        s0, s1, s2, s3 = style
+
         # Find out if we need to strip some of the leftmost prefixes.
         # If this was called for a normal node, we strip all parent levels
         # (and also the own prefix when `add_self` is false).
         # If this was called for the system root node, we do the same, but we
         # never render self, because the title is rendered by the caller.
-        lstrip = self.depth()
+        lstrip = self._depth
         if not add_self:
             lstrip += 1
         if not self._parent:
             add_self = False
 
-        for n in self.iterator(add_self=add_self):
-            prefix = n._get_prefix(style, lstrip)
+        # Walk the branch with an explicit stack of 3-tuples
+        # `(node, indent, is_last)`, where `indent` is the prefix that is
+        # contributed by the node's ancestors.
+        # All children of a node share the same indent string, so the prefix
+        # is computed once per parent instead of once per node and ancestor.
+        if add_self:
+            stack = [(self, "", True)]
+        elif self._children:
+            last = self._children[-1]
+            stack = [(c, "", c is last) for c in reversed(self._children)]
+        else:
+            return
+
+        while stack:
+            n, indent, is_last = stack.pop()
+            connect = n._depth > lstrip
 
             if callable(repr):
                 s = repr(n)
             else:
                 s = repr.format(node=n)
 
-            yield prefix + s
-
+            if connect:
+                yield indent + (s2 if is_last else s3) + s  # " ╰─ ", " ├─ "
+            else:
+                yield indent + s
+
+            children = n._children
+            if children:
+                if connect:
+                    indent += s0 if is_last else s1  # "    ", " |  "
+                last = children[-1]
+                stack.extend((c, indent, c is last) for c in reversed(children))
         return
 
     def format_iter(self, *, repr=None, style=None, add_self=True):
@@ -1231,21 +1539,39 @@ class Node:
 
     def to_dict(self, *, mapper: MapperCallbackType = None) -> Dict:
         """Return a nested dict of this node and its children."""
-        res = {
-            "data": str(self.data),
-        }
-        # Add custom data_id if any
-        # data_id = hash(self._data)
-        data_id = self._tree._calc_data_id(self._data)
-        if data_id != self._data_id:
-            res["data_id"] = data_id
-        res = call_mapper(mapper, self, res)
-        # if mapper:
-        #     res = mapper(self, res)
-        if self._children:
-            res["children"] = cl = []
-            for n in self._children:
-                cl.append(n.to_dict(mapper=mapper))
+        calc_id = self._tree._calc_data_id
+
+        def _to_dict(node: Node) -> Dict:
+            res = {
+                "data": str(node.data),
+            }
+            # Add custom data_id if any
+            # data_id = hash(node._data)
+            data_id = calc_id(node._data)
+            if data_id != node._data_id:
+                res["data_id"] = data_id
+            res = call_mapper(mapper, node, res)
+            # if mapper:
+            #     res = mapper(node, res)
+            return res
+
+        res = _to_dict(self)
+        if not self._children:
+            return res
+        # Non-recursive, pre-order: stack of `(child_iterator, target_list)`
+        res["children"] = []
+        stack = [(iter(self._children), res["children"])]
+        while stack:
+            child_iter, cl = stack[-1]
+            for n in child_iter:
+                d = _to_dict(n)
+                cl.append(d)
+                if n._children:
+                    d["children"] = []
+                    stack.append((iter(n._children), d["children"]))
+                    break
+            else:
+                stack.pop()
         return res
 
     def to_list_iter(
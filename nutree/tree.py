@@ -3,13 +3,24 @@
 """
 Declare the :class:`~nutree.tree.Tree` class.
 """
+import heapq
 import json
 import random
 import threading
 from pathlib import PurePath
-from typing import IO, Any, Dict, Generator, List, Union
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Sequence,
+    Union,
+)
 
-from nutree.diff import diff_tree
+from nutree.diff import diff_ops, diff_tree
 
 from .common import (
     AmbiguousMatchError,
@@ -18,14 +29,118 @@ from .common import (
     MapperCallbackType,
     PredicateCallbackType,
     TraversalCallbackType,
+    UniqueConstraintError,
     call_mapper,
 )
 from .dot import tree_to_dotfile
+from .frozen_tree import FrozenTree
+from .index import HashIndex, NameIndex, SortedIndex
 from .node import Node
 from .rdf import tree_to_rdf
 
 _DELETED_TAG = "<deleted>"
 
+#: Number of records that are encoded and written at once by :meth:`Tree.save`
+_SAVE_CHUNK_SIZE = 1000
+#: Number of characters that are read at once by :meth:`Tree.load`
+_LOAD_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def _write_json_list(fp: IO[str], records: Iterable[Any]) -> None:
+    """Write records as a JSON list, encoding `_SAVE_CHUNK_SIZE` at a time.
+
+    The output is the same as ``json.dump(list(records), fp)``.
+    """
+    encode = json.JSONEncoder().encode
+    fp.write("[")
+    chunk = []
+    sep = ""
+    for record in records:
+        chunk.append(encode(record))
+        if len(chunk) >= _SAVE_CHUNK_SIZE:
+            fp.write(sep + ", ".join(chunk))
+            chunk.clear()
+            sep = ", "
+    if chunk:
+        fp.write(sep + ", ".join(chunk))
+    fp.write("]")
+    return
+
+
+def _iter_json_list(fp: IO[str]) -> Generator[Any, None, None]:
+    """Parse a JSON list from a file stream and yield its elements one by one.
+
+    Only a chunk of the input text is held in memory at a time.
+    """
+    decode = json.JSONDecoder().raw_decode
+    buf = ""
+    pos = 0
+    eof = False
+
+    def _next_char():
+        # Skip whitespace, read more if needed, and return the next character
+        nonlocal buf, pos, eof
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos : pos + 1]
+            buf = fp.read(_LOAD_CHUNK_SIZE)
+            pos = 0
+            eof = not buf
+
+    if _next_char() != "[":
+        raise json.JSONDecodeError("Expecting '['", buf, pos)
+    pos += 1
+    if _next_char() == "]":
+        pos += 1
+        if _next_char():
+            raise json.JSONDecodeError("Extra data", buf, pos)
+        return
+    while True:
+        try:
+            value, end = decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            end = None
+
+        if end is not None and buf.startswith(", ", end):
+            if end + 2 < len(buf) and buf[end + 2] not in _WHITESPACE:
+                # Fast path: a complete element, followed by the default
+                # separator (as written by `Tree.save()`)
+                pos = end + 2
+                yield value
+                continue
+
+        if end is None or not (
+            eof or end < len(buf) and (buf[end - 1] in '"]}' or buf[end] in _DELIMITERS)
+        ):
+            # The element may be truncated (e.g. a number at the end of the
+            # buffer): read more and try again
+            chunk = fp.read(_LOAD_CHUNK_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        pos = end
+        yield value
+
+        c = _next_char()
+        if c == "]":
+            pos += 1
+            if _next_char():
+                raise json.JSONDecodeError("Extra data", buf, pos)
+            return
+        elif c != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+        pos += 1
+        _next_char()
+
 
 # ------------------------------------------------------------------------------
 # - Tree
@@ -40,16 +155,55 @@ class Tree:
     #: Default connector prefixes ``format(style=...)`` argument.
     default_connector_style = "round43"
 
-    def __init__(self, name: str = None, *, factory=None, calc_data_id=None):
+    def __init__(
+        self,
+        name: str = None,
+        *,
+        factory=None,
+        calc_data_id=None,
+        track_counts: bool = False,
+        name_index: bool = False,
+        child_index: bool = False,
+    ):
         self._lock = threading.RLock()
         self.name = str(id(self) if name is None else name)
         self._node_factory = factory or Node
         self._root = _SystemRootNode(self)
         self._node_by_id = {}
+        #: List of all nodes in arbitrary order, for O(1) random access
+        #: (`node._tree_pos` is the node's index)
+        self._node_list = []
+        #: Map data_id -> {node_id: node} of all clones (in insertion order)
         self._nodes_by_data_id = {}
         #: Optional callback that calculates data_ids from data objects
         #: hash(data) is used by default
         self._calc_data_id_hook = calc_data_id
+        #: If `track_counts` is true, we maintain a `[descendants, leaves]`
+        #: list per node_id, so :meth:`~nutree.node.Node.count_descendants`
+        #: is O(1)
+        self._subtree_counts = None
+        if track_counts:
+            self._subtree_counts = {self._root._node_id: [0, 0]}
+        #: Map name -> secondary index, updated when nodes are added, removed,
+        #: or modified (see :meth:`add_index`)
+        self._indexes = {}
+        #: If `name_index` is true, we maintain a trigram index of node names
+        #: to speed up ``find_all(match="regex")``
+        self._name_index = NameIndex() if name_index else None
+        #: All indexes that are updated on changes (`_indexes` and `_name_index`)
+        self._all_indexes = [self._name_index] if name_index else []
+        #: If `child_index` is true, we maintain a
+        #: `{parent_node_id: {data_id: child}}` map, so
+        #: :meth:`~nutree.node.Node.get_child` is O(1) and duplicate data
+        #: below one parent is rejected
+        self._child_index = {} if child_index else None
+        #: Cached `{with_meta: {node_id: fingerprint}}`, see
+        #: :meth:`~nutree.node.Node.fingerprint`. If a node is cached, all of
+        #: its descendants are cached as well.
+        self._fingerprints = {}
+        #: Lazily built `{repr: {parent_node_id: {name: child}}}` maps, used by
+        #: :meth:`find_by_path` (discarded when the parent's children change)
+        self._path_maps = {}
 
     def __repr__(self):
         return f"{self.__class__.__name__}<{self.name!r}>"
@@ -139,29 +293,72 @@ class Tree:
         assert node._tree is self
         # node._tree = self
         assert node._node_id and node._node_id not in self._node_by_id, f"{node}"
+        if self._child_index is not None:
+            self._add_to_child_index(node, node._parent)
+        # Index keys are user callbacks: call them before any other
+        # bookkeeping and undo on errors, so a failing key leaves the tree
+        # unchanged
+        for i, index in enumerate(self._all_indexes):
+            try:
+                index.add(node)
+            except Exception:
+                for added in self._all_indexes[:i]:
+                    added.remove(node)
+                if self._child_index is not None:
+                    self._remove_from_child_index(node, node._parent, node._data_id)
+                raise
+
         self._node_by_id[node._node_id] = node
+        node._tree_pos = len(self._node_list)
+        self._node_list.append(node)
         try:
-            self._nodes_by_data_id[node._data_id].append(node)
+            self._nodes_by_data_id[node._data_id][node._node_id] = node
         except KeyError:
-            self._nodes_by_data_id[node._data_id] = [node]
+            self._nodes_by_data_id[node._data_id] = {node._node_id: node}
+
+        if self._path_maps:
+            self._discard_path_maps(node._parent)
+        if self._fingerprints:
+            self._discard_fingerprints(node._parent)
+
+        if self._subtree_counts is not None:
+            # The new node is not yet linked to the parent's children
+            self._subtree_counts[node._node_id] = [0, 0]
+            parent = node._parent
+            self._add_counts(parent, 1, 1, -1 if not parent._children else 0)
 
     def _unregister(self, node, *, clear=True):
         """Unlink node from this tree (children must be unregistered first)."""
         assert node._node_id in self._node_by_id, f"{node}"
         del self._node_by_id[node._node_id]
 
-        clones = self._nodes_by_data_id[node._data_id]
-        # NOTE: `list.remove()` checks for equality ('=='), not identity!
-        # This would remove the first clone, but not neccessarily `node`
-        # clones.remove(node)
-        for i, n in enumerate(clones):
-            if n is node:
-                clones.pop(i)
-                break
+        # Swap-remove from the node list
+        last = self._node_list.pop()
+        if last is not node:
+            pos = node._tree_pos
+            self._node_list[pos] = last
+            last._tree_pos = pos
 
+        clones = self._nodes_by_data_id[node._data_id]
+        del clones[node._node_id]
         if not clones:
             del self._nodes_by_data_id[node._data_id]
 
+        if self._subtree_counts is not None:
+            del self._subtree_counts[node._node_id]
+
+        for index in self._all_indexes:
+            index.remove(node)
+
+        if self._path_maps:
+            self._discard_path_maps(node._parent)
+            self._discard_path_maps(node)
+        if self._fingerprints:
+            self._discard_fingerprints(node)
+
+        if self._child_index is not None:
+            self._remove_from_child_index(node, node._parent, node._data_id)
+
         node._tree = None
         node._parent = None
         if clear:
@@ -172,6 +369,116 @@ class Tree:
             node._meta = None
         return
 
+    def _update_index_entries(
+        self, nodes: List["Node"], new_data: Any, new_data_id: ItemIdType
+    ) -> None:
+        """Replace the index entries of `nodes` before `data` or `data_id` change.
+
+        The new keys are calculated with the new values temporarily assigned.
+        Index keys are user callbacks, so if one raises, the previous entries
+        are restored and the nodes are unchanged.
+        """
+        indexes = self._all_indexes
+        prev = [(n, n._data, n._data_id) for n in nodes]
+        for index in indexes:
+            for n in nodes:
+                index.remove(n)
+        added = []
+        try:
+            for n in nodes:
+                if new_data:
+                    n._data = new_data
+                if new_data_id:
+                    n._data_id = new_data_id
+            for index in indexes:
+                for n in nodes:
+                    index.add(n)
+                    added.append((index, n))
+        except Exception:
+            for index, n in added:
+                index.remove(n)
+            for n, data, data_id in prev:
+                n._data, n._data_id = data, data_id
+            for index in indexes:
+                for n in nodes:
+                    index.add(n)
+            raise
+        finally:
+            for n, data, data_id in prev:
+                n._data, n._data_id = data, data_id
+
+    def _check_child_index(self, parent: "Node", data_id: ItemIdType) -> None:
+        """Raise UniqueConstraintError if `parent` has a child with `data_id`."""
+        siblings = self._child_index.get(parent._node_id)
+        if siblings and data_id in siblings:
+            raise UniqueConstraintError(
+                f"Same data_id not allowed below one parent: {siblings[data_id]}"
+            )
+
+    def _add_to_child_index(self, node: "Node", parent: "Node") -> None:
+        self._check_child_index(parent, node._data_id)
+        try:
+            self._child_index[parent._node_id][node._data_id] = node
+        except KeyError:
+            self._child_index[parent._node_id] = {node._data_id: node}
+
+    def _remove_from_child_index(
+        self, node: "Node", parent: "Node", data_id: ItemIdType
+    ) -> None:
+        siblings = self._child_index[parent._node_id]
+        del siblings[data_id]
+        if not siblings:
+            del self._child_index[parent._node_id]
+
+    def _get_fingerprints(self, with_meta: bool) -> Dict:
+        try:
+            return self._fingerprints[with_meta]
+        except KeyError:
+            cache = self._fingerprints[with_meta] = {}
+            return cache
+
+    def _discard_fingerprints(self, node: "Node") -> None:
+        """Forget cached fingerprints of `node` and its ancestors."""
+        for cache in self._fingerprints.values():
+            # Stop early: if a node is not cached, its ancestors are not either
+            n = node
+            while n is not None and cache.pop(n._node_id, None):
+                n = n._parent
+
+    def _discard_path_maps(self, parent: "Node") -> None:
+        """Forget cached name -> child maps of `parent` (see :meth:`find_by_path`)."""
+        for maps in self._path_maps.values():
+            maps.pop(parent._node_id, None)
+
+    def _add_counts(
+        self, parent: "Node", count: int, leaves: int, leaf_delta: int
+    ) -> None:
+        """Add `count` descendants with `leaves` leaf nodes to `parent` and
+        all of its ancestors (pass negative values for removals).
+
+        `leaf_delta` is +1 if `parent` just became a leaf and -1 if it was a
+        leaf before. It is added to the leaf count of all ancestors.
+        """
+        counts = self._subtree_counts
+        c = counts[parent._node_id]
+        c[0] += count
+        c[1] += leaves
+        leaves += leaf_delta
+        parent = parent._parent
+        while parent is not None:
+            c = counts[parent._node_id]
+            c[0] += count
+            c[1] += leaves
+            parent = parent._parent
+        return
+
+    def _branch_counts(self, node: "Node") -> tuple:
+        """Return `(count, leaves)` of the branch, including `node` itself."""
+        if not node._children:
+            return (1, 1)
+        c = self._subtree_counts[node._node_id]
+        return (c[0] + 1, c[1])
+
     @property
     def children(self) -> List["Node"]:
         """Return list of direct child nodes, i.e. toplevel nodes
@@ -203,17 +510,86 @@ class Tree:
         return self._root.last_child()
 
     def get_random_node(self) -> Node:
-        """Return a random node.
+        """Return a random node (O(1)).
 
-        Note that there is also `IterMethod.RANDOM_ORDER`.
+        Note that there is also `IterMethod.RANDOM_ORDER` and :meth:`sample`.
         """
-        nbid = self._node_by_id
-        return nbid[random.choice(list(nbid.keys()))]
+        return random.choice(self._node_list)
+
+    def sample(
+        self, k: int = 1, *, weight: Union[str, Callable[[Node], float]] = None
+    ) -> List[Node]:
+        """Return a list of `k` distinct random nodes.
+
+        If `weight` is None, all nodes have the same probability.
+        Pass ``weight="size"`` to weight nodes by the size of their branch
+        (descendants + 1), or a callback ``weight(node) -> float``. Nodes with
+        weight 0 are never selected.
+
+        Weighted sampling is a single pass over all nodes (O(n log k)), see
+        Efraimidis & Spirakis, "Weighted random sampling with a reservoir".
+        It is O(1) per node for ``weight="size"`` if the tree was created
+        with ``track_counts=True``.
+        """
+        nodes = self._node_list
+        if weight is None:
+            return random.sample(nodes, k)
+
+        if weight == "size":
+            counts = self._subtree_counts
+            if counts is None:
+                # Calculate all branch sizes in one post-order pass
+                sizes = {}
+                for n in self._root._iter_post():
+                    size = sizes[n._node_id] = sizes.get(n._node_id, 0) + 1
+                    pid = n._parent._node_id
+                    sizes[pid] = sizes.get(pid, 0) + size
+
+                def weight(node: Node) -> int:
+                    return sizes[node._node_id]
+
+            else:
+
+                def weight(node: Node) -> int:
+                    return counts[node._node_id][0] + 1
+
+        elif not callable(weight):
+            raise ValueError(f"Invalid weight: {weight!r}")
+
+        def _keys():
+            rnd = random.random
+            for n in nodes:
+                w = weight(n)
+                if w > 0:
+                    yield (rnd() ** (1.0 / w), n._tree_pos)
+                elif w < 0:
+                    raise ValueError(f"Negative weight for {n}: {w}")
+
+        res = heapq.nlargest(k, _keys())
+        if len(res) < k:
+            raise ValueError(f"Sample larger than population with weight > 0: {k}")
+        return [nodes[pos] for _, pos in res]
 
     def calc_height(self) -> int:
         """Return the maximum depth of all nodes."""
         return self._root.calc_height()
 
+    def fingerprint(self, *, with_meta=False) -> str:
+        """Return a hash over the data_ids and structure of all nodes.
+
+        Two trees with equal fingerprints have the same structure and
+        data_ids (the tree name is not considered).
+        See :meth:`~nutree.node.Node.fingerprint`.
+        """
+        return self._root.fingerprint(with_meta=with_meta)
+
+    def clear_fingerprints(self) -> None:
+        """Release the cached fingerprints (see :meth:`fingerprint`).
+
+        Fingerprints are re-calculated on demand.
+        """
+        self._fingerprints.clear()
+
     def visit(
         self, callback: TraversalCallbackType, *, method=IterMethod.PRE_ORDER, memo=None
     ):
@@ -232,11 +608,19 @@ class Tree:
         if method == IterMethod.UNORDERED:
             return (n for n in self._node_by_id.values())
         elif method == IterMethod.RANDOM_ORDER:
-            values = list(self._node_by_id.values())
-            random.shuffle(values)
-            return (n for n in values)
+            return self._iter_random()
         return self._root.iterator(method=method)
 
+    def _iter_random(self) -> Generator[Node, None, None]:
+        """Yield all nodes in random order, shuffling lazily."""
+        nodes = self._node_list.copy()
+        randrange = random.randrange
+        for i in range(len(nodes) - 1, -1, -1):
+            j = randrange(i + 1)
+            nodes[i], nodes[j] = nodes[j], nodes[i]
+            yield nodes[i]
+        return
+
     #: Implement ``for node in tree: ...`` syntax to iterate nodes depth-first.
     __iter__ = iterator
 
@@ -314,6 +698,13 @@ class Tree:
         with self:
             self._root.copy_to(target, add_self=False, before=None, deep=deep)
 
+    def freeze(self, *, name: str = None) -> FrozenTree:
+        """Return an immutable, compact copy of this tree.
+
+        See :class:`~nutree.frozen_tree.FrozenTree` for details.
+        """
+        return FrozenTree(self, name=name)
+
     def filter(self, predicate: PredicateCallbackType) -> None:
         """In-place removal of unmatching nodes.
 
@@ -332,6 +723,46 @@ class Tree:
         """Remove all nodes from this tree."""
         self._root.remove_children()
 
+    def remove_many(self, nodes: Iterable["Node"]) -> int:
+        """Remove multiple nodes (and their descendants) at once.
+
+        Nodes are grouped by parent, so every affected child list is rebuilt
+        only once, which is much faster than calling
+        :meth:`~nutree.node.Node.remove` in a loop.
+        Nodes that are descendants of other passed nodes are removed with
+        their ancestor.
+        Return the number of removed branches.
+        """
+        remove_ids = set()
+        for n in nodes:
+            if n._tree is not self:
+                raise ValueError(f"Node is not part of {self}: {n}")
+            remove_ids.add(n._node_id)
+
+        #: Map parent_id -> parent, for all parents that lose children
+        parent_map = {}
+        for node_id in remove_ids:
+            parent = self._node_by_id[node_id]._parent
+            # Skip nodes that are removed together with one of their ancestors
+            p = parent
+            while p is not None and p._node_id not in remove_ids:
+                p = p._parent
+            if p is None:
+                parent_map[parent._node_id] = parent
+
+        res = 0
+        for parent in parent_map.values():
+            keep = []
+            removed = []
+            for c in parent._children:
+                if c._node_id in remove_ids:
+                    removed.append(c)
+                else:
+                    keep.append(c)
+            parent._remove_child_list(keep, removed)
+            res += len(removed)
+        return res
+
     def find_all(
         self, data=None, *, match=None, data_id=None, max_results: int = None
     ) -> List["Node"]:
@@ -346,9 +777,10 @@ class Tree:
 
         if data_id is not None:
             assert match is None
-            res = self._nodes_by_data_id.get(data_id)
-            if res:
-                return res[max_results:] if max_results else res
+            clones = self._nodes_by_data_id.get(data_id)
+            if clones:
+                res = list(clones.values())
+                return res[:max_results] if max_results else res
             return []
 
         elif match is not None:
@@ -373,8 +805,8 @@ class Tree:
         if data_id is not None:
             assert match is None
             assert node_id is None
-            res = self._nodes_by_data_id.get(data_id)
-            return res[0] if res else None
+            clones = self._nodes_by_data_id.get(data_id)
+            return next(iter(clones.values())) if clones else None
         elif match is not None:
             assert node_id is None
             return self._root.find_first(match=match)
@@ -385,6 +817,122 @@ class Tree:
     #: Alias for :meth:`find_first`
     find = find_first
 
+    def add_index(
+        self, name: str, key: Callable[[Node], Any], *, ordered: bool = False
+    ) -> None:
+        """Add a secondary index that maps ``key(node)`` values to nodes.
+
+        The index is maintained when nodes are added, removed, or modified
+        with :meth:`~nutree.node.Node.set_data`. Call :meth:`reindex` if data
+        objects were modified in-place.
+        Nodes for which `key` returns None are not indexed.
+
+        If `ordered` is true, keys are kept sorted, so the index can also be
+        queried by :meth:`find_range` (keys must be comparable then).
+
+        Example::
+
+            tree.add_index("size", lambda node: node.data.size)
+            nodes = tree.find_by("size", 4096)
+
+            tree.add_index("mdate", lambda node: node.data.mdate, ordered=True)
+            nodes = tree.find_range("mdate", low=yesterday)
+        """
+        if name in self._indexes:
+            raise ValueError(f"Index {name!r} already exists")
+        index = SortedIndex(key) if ordered else HashIndex(key)
+        index.add_many(self._node_by_id.values())
+        self._indexes[name] = index
+        self._all_indexes.append(index)
+
+    def remove_index(self, name: str) -> None:
+        """Remove a secondary index that was added by :meth:`add_index`."""
+        index = self._indexes.pop(name)
+        self._all_indexes.remove(index)
+
+    def find_by(self, name: str, value: Any) -> List[Node]:
+        """Return a list of nodes where the key of index `name` equals `value`.
+
+        See :meth:`add_index`.
+        """
+        return self._indexes[name].get(value)
+
+    def find_by_path(
+        self, path: str, *, separator: str = "/", repr: str = "{node.name}"
+    ) -> Union[Node, None]:
+        """Return the node that matches a breadcrumb path, e.g. '/A/a1/a12'.
+
+        This is the inverse of :meth:`~nutree.node.Node.get_path`, so
+        `separator` and `repr` should be the same as used there.
+        Return None if no node matches. If siblings have the same name, the
+        first one is returned.
+
+        Name -> child maps are built lazily per parent and cached until the
+        parent's children are modified, so repeated lookups cost O(depth).
+        Call :meth:`reindex` if data objects were renamed in-place.
+        """
+        if path.startswith(separator):
+            path = path[len(separator) :]
+        if not path:
+            return None
+        maps = self._path_maps.get(repr)
+        if maps is None:
+            maps = self._path_maps[repr] = {}
+        node = self._root
+        for name in path.split(separator):
+            child_map = maps.get(node._node_id)
+            if child_map is None:
+                child_map = {}
+                for c in node._children or ():
+                    child_map.setdefault(repr.format(node=c), c)
+                maps[node._node_id] = child_map
+            node = child_map.get(name)
+            if node is None:
+                return None
+        return node
+
+    def find_range(
+        self,
+        name: str,
+        low: Any = None,
+        high: Any = None,
+        *,
+        reverse: bool = False,
+        max_results: int = None,
+    ) -> List[Node]:
+        """Return a list of nodes where ``low <= key(node) <= high``.
+
+        `name` must be an index that was added with ``ordered=True``
+        (see :meth:`add_index`). `low` and `high` may be None for open ranges.
+        Nodes are sorted by key (descending if `reverse` is true).
+        Pass `max_results` to implement top-k or min/max queries::
+
+            oldest = tree.find_range("mdate", max_results=1)
+            largest_10 = tree.find_range("size", reverse=True, max_results=10)
+        """
+        index = self._indexes[name]
+        if not isinstance(index, SortedIndex):
+            raise ValueError(f"Index {name!r} is not ordered")
+        return index.range(low, high, reverse=reverse, max_results=max_results)
+
+    def reindex(self, name: str = None) -> None:
+        """Rebuild one or all secondary indexes.
+
+        This is required after data objects were modified in-place, so that
+        the values returned by the index keys have changed.
+        If `name` is None, the maps used by :meth:`find_by_path` are reset
+        as well.
+        """
+        if name is None:
+            self._path_maps.clear()
+            indexes = self._all_indexes
+        else:
+            indexes = [self._indexes[name]]
+        for index in indexes:
+            index.clear()
+            index.add_many(self._node_by_id.values())
+        return
+
     def sort(self, *, key=None, reverse=False, deep=True):
         """Sort toplevel nodes (optionally recursively).
 
@@ -414,6 +962,118 @@ class Tree:
         new_tree._root.from_dict(obj, mapper=mapper)
         return new_tree
 
+    @classmethod
+    def from_parent_indices(
+        cls,
+        data_seq: Sequence[Any],
+        parent_idx_seq: Sequence[int],
+        data_ids: Sequence[ItemIdType] = None,
+        *,
+        name: str = None,
+        factory=None,
+        calc_data_id=None,
+        track_counts: bool = False,
+        name_index: bool = False,
+        child_index: bool = False,
+    ) -> "Tree":
+        """Return a new :class:`Tree` instance from parallel sequences.
+
+        `parent_idx_seq[i]` is the index of the parent of `data_seq[i]` or -1
+        for toplevel nodes. Parents must precede their children, e.g. nodes
+        are listed in pre-order or level-order.
+        `data_ids` may be passed to define custom data_ids (None entries fall
+        back to the calculated value).
+
+        This is much faster than calling :meth:`add_child` for every node,
+        because nodes are created and registered in bulk.
+        """
+        count = len(data_seq)
+        if len(parent_idx_seq) != count:
+            raise ValueError("data_seq and parent_idx_seq must have equal length")
+        if data_ids is not None and len(data_ids) != count:
+            raise ValueError("data_seq and data_ids must have equal length")
+
+        tree = cls(
+            name,
+            factory=factory,
+            calc_data_id=calc_data_id,
+            track_counts=track_counts,
+            name_index=name_index,
+            child_index=child_index,
+        )
+        root = tree._root
+        calc_id = tree._calc_data_id
+        nodes = []
+
+        if tree._node_factory is not Node:
+            # Custom node classes may implement their own constructor logic
+            for idx, (data, parent_idx) in enumerate(zip(data_seq, parent_idx_seq)):
+                if not -1 <= parent_idx < idx:
+                    raise ValueError(f"Invalid parent index at #{idx}: {parent_idx}")
+                parent = root if parent_idx < 0 else nodes[parent_idx]
+                data_id = None if data_ids is None else data_ids[idx]
+                nodes.append(parent.add_child(data, data_id=data_id))
+            return tree
+
+        # Fast path: bypass `Node.__init__()` and `Tree._register()`
+        node_by_id = tree._node_by_id
+        nodes_by_data_id = tree._nodes_by_data_id
+        child_index = tree._child_index
+        new_node = Node.__new__
+        for idx, (data, parent_idx) in enumerate(zip(data_seq, parent_idx_seq)):
+            if not -1 <= parent_idx < idx:
+                raise ValueError(f"Invalid parent index at #{idx}: {parent_idx}")
+            parent = root if parent_idx < 0 else nodes[parent_idx]
+            data_id = None if data_ids is None else data_ids[idx]
+            if data_id is None:
+                data_id = calc_id(data)
+
+            node = new_node(Node)
+            node._data = data
+            node._parent = parent
+            node._tree = tree
+            node._children = None
+            node._depth = parent._depth + 1
+            node._data_id = data_id
+            node._node_id = node_id = id(node)
+            node._meta = None
+
+            children = parent._children
+            if children is None:
+                node._idx_hint = 0
+                parent._children = [node]
+            else:
+                node._idx_hint = len(children)
+                children.append(node)
+
+            node_by_id[node_id] = node
+            node._tree_pos = idx
+            clones = nodes_by_data_id.get(data_id)
+            if clones is None:
+                nodes_by_data_id[data_id] = {node_id: node}
+            else:
+                clones[node_id] = node
+            if child_index is not None:
+                tree._add_to_child_index(node, parent)
+            nodes.append(node)
+        tree._node_list = nodes
+
+        counts = tree._subtree_counts
+        if counts is not None:
+            # Children always follow their parents, so a reverse scan visits
+            # every branch before its parent
+            for node in nodes:
+                counts[node._node_id] = [0, 0]
+            for node in reversed(nodes):
+                c = counts[node._node_id]
+                pc = counts[node._parent._node_id]
+                pc[0] += c[0] + 1
+                pc[1] += c[1] if node._children else 1
+
+        for index in tree._all_indexes:
+            index.add_many(nodes)
+        return tree
+
     def to_list_iter(
         self, *, mapper: MapperCallbackType = None
     ) -> Generator[Dict, None, None]:
@@ -423,27 +1083,35 @@ class Tree:
     def save(self, fp: IO[str], *, mapper: MapperCallbackType = None) -> None:
         """Store tree in a compact JSON file stream.
 
+        The output is the same as ``json.dump(list(tree.to_list_iter()), fp)``,
+        but records are encoded and written in chunks, so memory use does not
+        grow with the tree size.
+
         See also :meth:`to_list_iter` and :meth:`load` methods.
         """
+        # Hold the lock while writing, so we store a consistent snapshot
         with self:
-            iter = self.to_list_iter(mapper=mapper)
-            # Materialize so we can lock the snapshot.
-            # Also because json.dump() does not supprt streaming
-            # TODO: Use s.th. like https://github.com/daggaz/json-stream ?
-            json.dump(list(iter), fp)
+            _write_json_list(fp, self.to_list_iter(mapper=mapper))
         return
 
     @classmethod
-    def _from_list(cls, obj: List[Dict], *, mapper=None) -> "Tree":
+    def _from_list(cls, obj: Iterable[List], *, mapper=None) -> "Tree":
         tree = Tree()
-        node_idx_map = {0: tree._root}
-        for idx, (parent_idx, data) in enumerate(obj, 1):
-            parent = node_idx_map[parent_idx]
+        # Nodes by record index (1-based, 0 is the system root)
+        nodes = [tree._root]
+        for parent_idx, data in obj:
+            # Reject negative and forward references (list indexing would
+            # silently pick a wrong node)
+            if not 0 <= parent_idx < len(nodes):
+                raise ValueError(f"Invalid parent index at #{len(nodes)}: {parent_idx}")
+            parent = nodes[parent_idx]
             # print(idx, parent_idx, data, parent)
             if type(data) is str:
                 n = parent.add(data)
             elif type(data) is int:
-                first_clone = node_idx_map[data]
+                if not 0 < data < len(nodes):
+                    raise ValueError(f"Invalid clone index at #{len(nodes)}: {data}")
+                first_clone = nodes[data]
                 n = parent.add(first_clone)
             elif mapper:
                 data = call_mapper(mapper, parent, data)
@@ -451,7 +1119,7 @@ class Tree:
             else:
                 raise RuntimeError("Need mapper")  # pragma: no cover
 
-            node_idx_map[idx] = n
+            nodes.append(n)
 
         return tree
 
@@ -459,10 +1127,12 @@ class Tree:
     def load(cls, fp: IO[str], *, mapper=None) -> "Tree":
         """Create a new :class:`Tree` instance from a JSON file stream.
 
+        Records are parsed incrementally and discarded as soon as the node
+        is created, so the whole JSON document is never held in memory.
+
         See also :meth:`save`.
         """
-        obj = json.load(fp)
-        return cls._from_list(obj, mapper=mapper)
+        return cls._from_list(_iter_json_list(fp), mapper=mapper)
 
     def to_dot(
         self,
@@ -546,11 +1216,121 @@ class Tree:
         If `reduce` is true, unchanged nodes are removed, leaving a compact tree
         with only the modifications.
 
+        Cached fingerprints of both trees are used to skip identical branches
+        (see :meth:`fingerprint`). If a tree has no cache, a temporary one is
+        used and released afterwards.
+
         See :ref:`Diff and Merge` for details.
         """
         t = diff_tree(self, other, ordered=ordered, reduce=reduce)
         return t
 
+    def diff_ops(self, other: "Tree", *, ordered=False) -> Generator[Dict, None, None]:
+        """Yield a compact sequence of operations that transform this tree
+        into `other`.
+
+        Unlike :meth:`diff`, no merged tree is created, so memory use is
+        proportional to the number of changes.
+        See :func:`~nutree.diff.diff_ops` for the operation format.
+        """
+        return diff_ops(self, other, ordered=ordered)
+
+    def _get_child_by_data_id(self, parent: Node, data_id: ItemIdType) -> Node:
+        """Return the child of `parent` with `data_id` (O(1) if not a clone)."""
+        clones = self._nodes_by_data_id.get(data_id)
+        if clones and len(clones) == 1:
+            node = next(iter(clones.values()))
+            if node._parent is parent:
+                return node
+        else:
+            node = parent.get_child(data_id=data_id)
+            if node is not None:
+                return node
+        raise KeyError(f"{parent} has no child with data_id {data_id!r}")
+
+    def _get_node_by_path(self, path: Sequence[ItemIdType]) -> Node:
+        """Return the node for a tuple of data_ids (see :meth:`apply_patch`)."""
+        if not path:
+            return self._root
+        # Shortcut for the common case, where the data_id is not a clone
+        clones = self._nodes_by_data_id.get(path[-1])
+        if clones and len(clones) == 1:
+            node = next(iter(clones.values()))
+            if node._depth == len(path):
+                # Check the ancestors, the tree may differ from the diff base
+                p = node._parent
+                for data_id in reversed(path[:-1]):
+                    if p._data_id != data_id:
+                        break
+                    p = p._parent
+                else:
+                    return node
+        node = self._root
+        for data_id in path:
+            node = self._get_child_by_data_id(node, data_id)
+        return node
+
+    def apply_patch(
+        self,
+        patch: Iterable[Dict],
+        *,
+        mapper: Callable[[Node, Any], Any] = None,
+    ) -> int:
+        """Apply a sequence of operations, as yielded by :meth:`diff_ops`.
+
+        This allows to sync replicas by transferring only the changes, e.g.::
+
+            patch = list(tree_0.diff_ops(tree_1))
+            ...
+            replica.apply_patch(patch)  # now `replica` matches `tree_1`
+
+        The patch may be serialized (e.g. to JSON), if the `data` of added
+        nodes is serializable. Pass `mapper(parent, data)` to convert `data`
+        back when nodes are added.
+        Nodes are looked up by data_id, so the cost is proportional to the
+        size of the patch, not the size of the tree.
+        Return the number of applied operations.
+        """
+        count = 0
+        with self:
+            for op in patch:
+                kind = op["op"]
+                parent = self._get_node_by_path(op["parent"])
+
+                if kind in ("add", "move"):
+                    after = op["after"]
+                    if after is None:
+                        before = True
+                    else:
+                        before = self._get_child_by_data_id(parent, after)
+                        before = before.next_sibling()
+
+                    if kind == "add":
+                        data = op["data"]
+                        if mapper:
+                            data = mapper(parent, data)
+                        parent.add_child(data, before=before, data_id=op["data_id"])
+                    else:
+                        clones = self._nodes_by_data_id.get(op["data_id"])
+                        if not clones or len(clones) != 1:
+                            raise KeyError(f"Cannot move data_id {op['data_id']!r}")
+                        node = next(iter(clones.values()))
+                        node.move_to(parent, before=before)
+
+                elif kind == "reorder":
+                    order = {data_id: i for i, data_id in enumerate(op["order"])}
+                    parent.sort_children(
+                        key=lambda n: order.get(n._data_id, len(order))
+                    )
+
+                elif kind == "remove":
+                    self._get_child_by_data_id(parent, op["data_id"]).remove()
+
+                else:
+                    raise ValueError(f"Invalid patch operation: {op!r}")
+                count += 1
+        return count
+
     # def on(self, event_name: str, callback):
     #     raise NotImplementedError
 
@@ -563,7 +1343,8 @@ class Tree:
         for node in self:
             node_list.append(node)
             assert node._tree is self, node
-            assert node in node._parent._children, node
+            assert node._parent._children[node._sibling_index()] is node, node
+            assert node._depth == node._parent._depth + 1, node
             # assert node._data_id == self._calc_data_id(node.data), node
             assert node._data_id in self._nodes_by_data_id, node
             assert node._node_id == id(node), f"{node}: {node._node_id} != {id(node)}"
@@ -572,14 +1353,70 @@ class Tree:
             ), f"{node}: {node._children}"
 
         assert len(self._node_by_id) == len(node_list)
+        assert len(self._node_list) == len(node_list)
+        for pos, node in enumerate(self._node_list):
+            assert node._tree_pos == pos, node
+            assert self._node_by_id[node._node_id] is node, node
 
         clone_count = 0
         for data_id, nodes in self._nodes_by_data_id.items():
             clone_count += len(nodes)
-            for node in nodes:
+            for node_id, node in nodes.items():
+                assert node_id == node._node_id, node
                 assert node._node_id in self._node_by_id, node
                 assert node._data_id == data_id, node
         assert clone_count == len(node_list)
+
+        if self._name_index is not None:
+            names = {n._node_id: n.name for n in node_list}
+            assert self._name_index._names == names
+        assert self._all_indexes == [
+            i for i in (self._name_index, *self._indexes.values()) if i is not None
+        ]
+        for index in self._all_indexes:
+            assert len(index) == len(node_list), index
+            if isinstance(index, SortedIndex):
+                assert index._sorted == sorted(index._sorted), index
+
+        for repr, maps in self._path_maps.items():
+            for parent_id, child_map in maps.items():
+                if parent_id == self._root._node_id:
+                    parent = self._root
+                else:
+                    parent = self._node_by_id[parent_id]
+                names = {}
+                for c in parent._children or ():
+                    names.setdefault(repr.format(node=c), c)
+                assert child_map == names, parent
+
+        if self._child_index is not None:
+            child_ids = {}
+            for node in node_list:
+                siblings = child_ids.setdefault(node._parent._node_id, {})
+                siblings[node._data_id] = node._node_id
+            assert child_ids == {
+                parent_id: {data_id: n._node_id for data_id, n in siblings.items()}
+                for parent_id, siblings in self._child_index.items()
+            }
+
+        for with_meta, cache in self._fingerprints.items():
+            fresh = {}
+            for node_id, fp in cache.items():
+                if node_id == self._root._node_id:
+                    node = self._root
+                else:
+                    node = self._node_by_id[node_id]
+                assert node._calc_fingerprint(fresh, with_meta) == fp, node
+                for c in node._children or ():
+                    assert c._node_id in cache, c
+
+        if self._subtree_counts is not None:
+            assert len(self._subtree_counts) == len(node_list) + 1
+            for node in [self._root] + node_list:
+                descendants = list(node._iter_pre())
+                leaves = [n for n in descendants if not n._children]
+                counts = self._subtree_counts[node._node_id]
+                assert counts == [len(descendants), len(leaves)], node
         return True
 
 
@@ -597,3 +1434,4 @@ class _SystemRootNode(Node):
         self._data = tree.name
         self._children = []
         self._meta = None
+        self._depth = 0
@@ -3,7 +3,7 @@
 """
 Declare the :class:`~nutree.tree.TypedTree` class.
 """
-from typing import Any, Dict, Generator, List, Union
+from typing import Any, Dict, Generator, List, Sequence, Union
 
 from nutree.common import (
     IterMethod,
@@ -51,11 +51,12 @@ class TypedNode(Node):
         node_id=None,
         meta: Dict = None,
     ):
+        assert isinstance(kind, str) and kind != ANY_KIND
+        # Set before registering, so index keys can access `node.kind`
+        self._kind = kind
         super().__init__(
             data, parent=parent, data_id=data_id, node_id=node_id, meta=meta
         )
-        assert isinstance(kind, str) and kind != ANY_KIND
-        self._kind = kind
         # del self._children
         # self._child_map: Dict[Node] = None
 
@@ -165,7 +166,7 @@ class TypedNode(Node):
     def prev_sibling(self, *, any_kind=False) -> Union["TypedNode", None]:
         """Return predecessor `of the same kind` or None if node is first sibling."""
         pc = self._parent._children
-        own_idx = pc.index(self)
+        own_idx = self._sibling_index()
         if own_idx > 0:
             for idx in range(own_idx - 1, -1, -1):
                 n = pc[idx]
@@ -177,7 +178,7 @@ class TypedNode(Node):
         """Return successor `of the same kind` or None if node is last sibling."""
         pc = self._parent._children
         pc_len = len(pc)
-        own_idx = pc.index(self)
+        own_idx = self._sibling_index()
 
         if own_idx < pc_len - 2:
             for idx in range(own_idx + 1, pc_len):
@@ -196,10 +197,12 @@ class TypedNode(Node):
     def get_index(self, *, any_kind=False) -> int:
         """Return index in sibling list."""
         if any_kind:
-            kc = self._parent._children
-        else:
-            kc = self.parent.get_children(self.kind)
-        return kc.index(self)
+            return self._sibling_index()
+        kc = self.parent.get_children(self.kind)
+        for idx, n in enumerate(kc):
+            if n is self:
+                return idx
+        raise ValueError(f"{self} is not a child of {self._parent}")
 
     def is_first_sibling(self, *, any_kind=False) -> bool:
         """Return true if this node is the first sibling, i.e. the first child
@@ -287,16 +290,22 @@ class TypedNode(Node):
         elif before is True:  # prepend
             children.insert(0, node)
         elif type(before) is int:
-            children.insert(before, node)
+            # Use the real position, e.g. `before=-1` or out of range
+            idx = len(children)
+            idx = max(0, idx + before) if before < 0 else min(before, idx)
+            children.insert(idx, node)
+            node._idx_hint = idx
         elif before:
             if before._parent is not self:
                 raise ValueError(
                     f"`before=node` ({before._parent}) "
                     f"must be a child of target node ({self})"
                 )
-            idx = children.index(before)  # raises ValueError
+            idx = before._sibling_index()  # raises ValueError
             children.insert(idx, node)
+            node._idx_hint = idx
         else:
+            node._idx_hint = len(children)
             children.append(node)
 
         if deep and source_node:
@@ -628,10 +637,26 @@ class TypedTree(Tree):
     See :ref:`Typed Tree` for details.
     """
 
-    def __init__(self, name: str = None, *, factory=None, calc_data_id=None):
+    def __init__(
+        self,
+        name: str = None,
+        *,
+        factory=None,
+        calc_data_id=None,
+        track_counts: bool = False,
+        name_index: bool = False,
+        child_index: bool = False,
+    ):
         if factory is None:
             factory = TypedNode
-        super().__init__(name, factory=factory, calc_data_id=calc_data_id)
+        super().__init__(
+            name,
+            factory=factory,
+            calc_data_id=calc_data_id,
+            track_counts=track_counts,
+            name_index=name_index,
+            child_index=child_index,
+        )
         self._root = _SystemRootTypedNode(self)
 
     def __getitem__(self, data: object) -> "TypedNode":
@@ -663,6 +688,56 @@ class TypedTree(Tree):
     #: Alias for :meth:`add_child`
     add = add_child  # Must re-bind here
 
+    def freeze(self, *, name: str = None):
+        """Not supported: FrozenTree does not store the `kind` of nodes."""
+        raise NotImplementedError("FrozenTree does not store the `kind` of nodes")
+
+    @classmethod
+    def from_parent_indices(
+        cls,
+        data_seq: Sequence[Any],
+        parent_idx_seq: Sequence[int],
+        data_ids: Sequence = None,
+        *,
+        kinds: Sequence[str],
+        name: str = None,
+        factory=None,
+        calc_data_id=None,
+        track_counts: bool = False,
+        name_index: bool = False,
+        child_index: bool = False,
+    ) -> "TypedTree":
+        """Return a new :class:`TypedTree` instance from parallel sequences.
+
+        `kinds[i]` is the kind of the node for `data_seq[i]`.
+        See Tree's :meth:`~nutree.tree.Tree.from_parent_indices` for details.
+        """
+        count = len(data_seq)
+        if len(parent_idx_seq) != count or len(kinds) != count:
+            raise ValueError(
+                "data_seq, parent_idx_seq, and kinds must have equal length"
+            )
+        if data_ids is not None and len(data_ids) != count:
+            raise ValueError("data_seq and data_ids must have equal length")
+
+        tree = cls(
+            name,
+            factory=factory,
+            calc_data_id=calc_data_id,
+            track_counts=track_counts,
+            name_index=name_index,
+            child_index=child_index,
+        )
+        root = tree._root
+        nodes = []
+        for idx, (data, parent_idx) in enumerate(zip(data_seq, parent_idx_seq)):
+            if not -1 <= parent_idx < idx:
+                raise ValueError(f"Invalid parent index at #{idx}: {parent_idx}")
+            parent = root if parent_idx < 0 else nodes[parent_idx]
+            data_id = None if data_ids is None else data_ids[idx]
+            nodes.append(parent.add_child(data, kind=kinds[idx], data_id=data_id))
+        return tree
+
     def iter_by_type(
         self, kind: Union[str, ANY_KIND]
     ) -> Generator[TypedNode, None, None]:
@@ -688,4 +763,5 @@ class _SystemRootTypedNode(TypedNode):
         self._data = tree.name
         self._children = []
         self._meta = None
+        self._depth = 0
         self._kind = None
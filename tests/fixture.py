@@ -120,6 +120,15 @@ def generate_tree(level_defs: List, root=None) -> "Tree":
     return tree
 
 
+def generate_chain(depth: int) -> "Tree":
+    """Generate a degenerated tree, where every node has exactly one child."""
+    tree = Tree()
+    node = tree._root
+    for i in range(depth):
+        node = node.add(f"n.{i + 1}")
+    return tree
+
+
 def flatten_nodes(tree):
     """Return a comma separated list of node names."""
     res = []
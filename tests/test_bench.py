@@ -158,6 +158,41 @@ class TestBenchmarks:
             )
         )
 
+        for shape, tree in (
+            ("deep", fixture.generate_chain(500)),
+            ("wide", fixture.generate_tree([5000])),
+        ):
+            for ORDER in (IterMethod.PRE_ORDER, IterMethod.POST_ORDER):
+                results.append(
+                    fixture.run_timings(
+                        f"{shape} tree ({len(tree):,} nodes), "
+                        f"for _ in tree.iterator({ORDER}): ...",
+                        """\
+                    for _ in tree.iterator(ORDER): pass
+                """,
+                        globals=locals(),
+                    )
+                )
+
+        with capsys.disabled():
+            print("\n  - ".join(results))
+
+    def test_format(self, capsys):
+        """ """
+
+        results = ["Benchmark results"]
+        tree = fixture.generate_tree([10, 10, 10])
+
+        results.append(
+            fixture.run_timings(
+                f"tree.format() ({len(tree):,} nodes)",
+                """\
+            _ = tree.format()
+        """,
+                globals=locals(),
+            )
+        )
+
         with capsys.disabled():
             print("\n  - ".join(results))
 
@@ -72,3 +72,39 @@ class TestClones:
         assert res == []
 
         assert tree._self_check()
+
+    def test_clone_bookkeeping(self):
+        tree = self.tree
+        tag = "shared"
+        parents = [tree.add(f"p{i}") for i in range(10)]
+        clones = [p.add(tag) for p in parents]
+
+        assert tree.find_all(tag) == clones
+        assert all(a is b for a, b in zip(tree.find_all(tag), clones))
+        assert tree.find(tag) is clones[0]
+        assert clones[3].get_clones(add_self=True) == clones
+
+        # Removal by identity, although all clones compare equal
+        clones[3].remove()
+        res = clones[0].get_clones()
+        assert len(res) == 8
+        assert all(n is not clones[3] for n in res)
+        assert tree._self_check()
+
+        # Re-key a single clone
+        clones[5].set_data("other", with_clones=False)
+        assert len(tree.find_all(tag)) == 8
+        assert tree.find("other") is clones[5]
+        clones[6].set_data("other", with_clones=False)
+        assert tree.find_all("other") == [clones[5], clones[6]]
+        assert tree._self_check()
+
+        # Re-key all clones, merging into an existing slot
+        clones[0].set_data("other", with_clones=True)
+        assert tree.find_all(tag) == []
+        assert len(tree.find_all("other")) == 9
+        assert tree._self_check()
+
+        tree.remove_many(parents)
+        assert tree.count == 0
+        assert tree._self_check()
@@ -8,7 +8,15 @@ from pathlib import Path
 
 import pytest
 
-from nutree import AmbiguousMatchError, IterMethod, Node, Tree
+from nutree import (
+    AmbiguousMatchError,
+    DiffClassification,
+    IterMethod,
+    Node,
+    Tree,
+    TypedTree,
+    UniqueConstraintError,
+)
 from nutree.common import SkipBranch, StopTraversal
 from nutree.fs import load_tree_from_fs
 
@@ -255,6 +263,154 @@ class TestNavigate:
         assert tree["a11"].get_index() == 0
         assert tree["a12"].get_index() == 1
 
+        # Removed nodes are detached
+        a, a1, a11, a12 = tree["A"], tree["a1"], tree["a11"], tree["a12"]
+        a11.remove()
+        assert not a11.is_descendant_of(a)
+        assert not a.is_ancestor_of(a11)
+        a1.remove()
+        assert not a12.is_descendant_of(a)
+        assert not a.is_ancestor_of(a12)
+
+    def test_find_in_branch(self):
+        tree = fixture.create_tree(clones=True)
+        a11 = tree.find_all("a11")
+        assert len(a11) == 2
+
+        assert tree["A"].find_all("a11") == [a11[0]]
+        assert tree["B"].find_all("a11") == [a11[1]]
+        assert tree["b1"].find_all(data_id=a11[1].data_id) == [a11[1]]
+        assert tree["a2"].find_all("a11") == []
+        assert tree["A"].find_first("a11") is a11[0]
+        assert tree["A"].find_first("b1") is None
+        assert a11[0].find_all("a11") == []
+        assert a11[0].find_all("a11", add_self=True) == [a11[0]]
+        assert tree._root.find_all("a11") == a11
+        assert tree.find_all("a11", max_results=1) == [a11[0]]
+
+    def test_find_by_path(self):
+        tree = fixture.create_tree(clones=True)
+        for node in tree:
+            assert tree.find_by_path(node.get_path()) is node
+        a11 = tree.find_all("a11")
+        assert tree.find_by_path("/B/b1/a11") is a11[1]
+        assert tree.find_by_path("A/a1/a11") is a11[0]
+        assert tree.find_by_path("A.a1.a11", separator=".") is a11[0]
+        assert tree.find_by_path("/A/a1/x") is None
+        assert tree.find_by_path("/A/a1/a11/x") is None
+        assert tree.find_by_path("/") is None
+        assert tree._self_check()
+
+        # Cached maps are updated on add, remove, move, rename, and sort
+        a1 = tree["a1"]
+        a13 = a1.add("a13")
+        assert tree.find_by_path("/A/a1/a13") is a13
+        a13.rename("a14")
+        assert tree.find_by_path("/A/a1/a13") is None
+        assert tree.find_by_path("/A/a1/a14") is a13
+        a13.move_to(tree["B"])
+        assert tree.find_by_path("/A/a1/a14") is None
+        assert tree.find_by_path("/B/a14") is a13
+        dup = tree["B"].add("a14", before=True)
+        assert tree.find_by_path("/B/a14") is dup
+        tree["B"].sort_children(key=lambda n: n is dup)
+        assert tree.find_by_path("/B/a14") is a13
+        a1.remove()
+        assert tree.find_by_path("/A/a1") is None
+        assert tree.find_by_path("/A/a2") is tree["a2"]
+        assert tree._self_check()
+
+        tree.clear()
+        assert tree.find_by_path("/A") is None
+        assert tree._self_check()
+
+    def test_sample(self):
+        for track_counts in (False, True):
+            tree = fixture.create_tree(tree=Tree("fixture", track_counts=track_counts))
+            assert tree.get_random_node() in list(tree)
+
+            res = tree.sample(3)
+            assert len(res) == 3
+            assert len({n.node_id for n in res}) == 3
+            assert len(tree.sample(8)) == 8
+            with pytest.raises(ValueError):
+                tree.sample(9)
+
+            # Only 'A' and 'B' have a weight
+            res = tree.sample(2, weight=lambda n: 1 if n.is_top() else 0)
+            assert sorted(n.name for n in res) == ["A", "B"]
+            with pytest.raises(ValueError):
+                tree.sample(3, weight=lambda n: 1 if n.is_top() else 0)
+            with pytest.raises(ValueError):
+                tree.sample(1, weight=lambda n: -1)
+            with pytest.raises(ValueError):
+                tree.sample(1, weight="unknown")
+
+            # Branch sizes sum up to 17, so 'A' (5 nodes) has p = 5 / 17
+            res = [tree.sample(1, weight="size")[0].name for _ in range(2000)]
+            assert 450 < res.count("A") < 730
+            assert 0 < res.count("b11") < 250
+            assert tree._self_check()
+
+            # Node list is maintained
+            tree["a1"].remove()
+            tree["B"].add("b2")
+            assert len(tree.sample(6)) == 6
+            assert tree._self_check()
+
+    def test_sibling_index(self):
+        class Item:
+            """All instances compare equal, so only identity can tell them apart."""
+
+            def __eq__(self, other):
+                return True
+
+            __hash__ = object.__hash__
+
+        tree = Tree()
+        parent = tree.add("P")
+        items = [parent.add(Item()) for _ in range(10)]
+
+        assert [n.get_index() for n in items] == list(range(10))
+        assert items[3].prev_sibling() is items[2]
+        assert items[3].next_sibling() is items[4]
+
+        # Position hints become stale and are refreshed on demand
+        first = parent.add(Item(), before=True)
+        assert first.get_index() == 0
+        assert items[3].get_index() == 4
+        new = parent.add(Item(), before=items[5])
+        assert new.get_index() == 6
+        assert new.prev_sibling() is items[4]
+        assert new.next_sibling() is items[5]
+
+        items[0].move_to(parent)
+        assert items[0].get_index() == 11
+        assert items[1].get_index() == 1
+
+        items[7].remove()
+        assert items[8].prev_sibling() is items[6]
+        parent.sort_children(key=id)
+        for idx, n in enumerate(parent.children):
+            assert n.get_index() == idx
+
+        # Integer positions behave like `list.insert()`
+        count = len(parent.children)
+        for before, idx in ((-1, count - 1), (-100, 0), (100, count + 2)):
+            n = parent.add(Item(), before=before)
+            assert n.get_index() == idx
+            assert parent.children[idx] is n
+        assert n.next_sibling() is None
+        assert parent.children[0].next_sibling() is parent.children[1]
+
+        typed = TypedTree()
+        typed.add("a", kind="letter")
+        b = typed.add("b", kind="letter", before=-5)
+        assert b.get_index(any_kind=True) == 0
+        assert [n.name for n in typed.children] == ["b", "a"]
+
+        assert tree._self_check()
+
     def test_data_id(self):
         """
         Tree<'fixture'>
@@ -559,6 +715,56 @@ class TestTraversal:
         s = [n.data for n in tree.iterator(IterMethod.RANDOM_ORDER)]
         assert len(s) == 8
 
+    def test_iter_deep(self):
+        # Deeper than the default recursion limit
+        tree = Tree()
+        node = tree._root
+        for i in range(5000):
+            node = node.add(f"n{i}")
+
+        res = [n.data for n in tree]
+        assert len(res) == 5000
+        assert res[0] == "n0" and res[-1] == "n4999"
+
+        res = [n.data for n in tree.iterator(IterMethod.POST_ORDER)]
+        assert len(res) == 5000
+        assert res[0] == "n4999" and res[-1] == "n0"
+
+        top = tree.first_child()
+        res = list(top.iterator(IterMethod.POST_ORDER, add_self=True))
+        assert len(res) == 5000 and res[-1] is top
+
+    def test_deep_branch(self):
+        # Deeper than the default recursion limit
+        tree = fixture.generate_chain(5000)
+        assert tree.calc_height() == 5000
+
+        res = []
+        tree.visit(lambda node, memo: res.append(node))
+        assert len(res) == 5000 and res[-1].data == "n.5000"
+        res = []
+        tree.visit(lambda node, memo: res.append(node), method=IterMethod.POST_ORDER)
+        assert len(res) == 5000 and res[0].data == "n.5000"
+
+        tree_2 = tree.copy()
+        assert tree_2.calc_height() == 5000
+        assert tree_2._self_check()
+
+        tree_2 = tree.filtered(lambda node: node.data == "n.4000")
+        assert tree_2.find("n.4000").depth() == 4000
+        assert tree_2._self_check()
+        tree.filter(lambda node: node.data == "n.4000")
+        assert len(tree) == 4000
+        assert tree._self_check()
+
+        tree_2 = Tree.from_dict(tree.to_dict())
+        assert len(tree_2) == 4000
+        assert tree_2._self_check()
+
+        tree_2["n.3000"].remove()
+        tree_3 = tree.diff(tree_2, reduce=True)
+        assert tree_3.find("n.3000").get_meta("dc") == DiffClassification.REMOVED
+
     def test_visit(self):
         """
         Tree<'fixture'>
@@ -804,6 +1010,203 @@ class TestMutate:
         )
         assert tree._self_check()
 
+        # Depth is updated for the whole moved branch
+        assert a11.depth() == 3
+        b1.move_to(tree["a12"])
+        assert b1.depth() == 4
+        assert a11.depth() == 5
+        assert a11.calc_depth() == 5
+        assert tree._self_check()
+
+        b1.remove(keep_children=True)
+        assert a11.depth() == 4
+        assert tree["b11"].depth() == 4
+        assert tree._self_check()
+
+    def test_track_counts(self):
+        tree = fixture.create_tree(tree=Tree("fixture", track_counts=True))
+        assert tree._self_check()
+
+        a = tree["A"]
+        assert a.count_descendants() == 4
+        assert a.count_descendants(leaves_only=True) == 3
+        assert tree._root.count_descendants() == 8
+
+        tree["a2"].add("a21")
+        assert a.count_descendants() == 5
+        assert a.count_descendants(leaves_only=True) == 3
+        assert tree._self_check()
+
+        tree["a1"].move_to(tree["b11"])
+        assert a.count_descendants() == 2
+        assert tree["B"].count_descendants() == 5
+        assert tree["B"].count_descendants(leaves_only=True) == 2
+        assert tree._self_check()
+
+        tree["b1"].remove(keep_children=True)
+        assert tree._self_check()
+        tree["a1"].remove_children()
+        assert tree["B"].count_descendants() == 2
+        assert tree._self_check()
+        tree["A"].remove()
+        assert tree._root.count_descendants() == 3
+        assert tree._self_check()
+
+        tree.filter(lambda node: node.name == "a1")
+        assert tree._root.count_descendants() == 3
+        assert tree._self_check()
+
+        tree.clear()
+        assert tree._root.count_descendants() == 0
+        assert tree._self_check()
+
+    def test_remove_many(self):
+        tree = fixture.create_tree(tree=Tree("fixture", track_counts=True), clones=True)
+        a1 = tree["a1"]
+        res = a1.remove_children_where(lambda n: n.name == "a11")
+        assert res == 1
+        assert tree._self_check()
+        assert fixture.check_content(
+            tree,
+            """
+            Tree<*>
+            +- A
+            |  +- a1
+            |  |  `- a12
+            |  `- a2
+            `- B
+               `- b1
+                  +- a11
+                  `- b11
+            """,
+        )
+        assert tree["a12"].get_index() == 0
+        assert not tree["a11"].is_clone()
+        assert a1.remove_children_where(lambda n: False) == 0
+        assert tree["a2"].remove_children_where(lambda n: True) == 0
+
+        assert a1.remove_children_where(lambda n: True) == 1
+        assert a1.is_leaf()
+        assert tree["A"].count_descendants(leaves_only=True) == 2
+        assert tree._self_check()
+
+        # Nested nodes are removed with their ancestor
+        tree = fixture.create_tree(tree=Tree("fixture", track_counts=True), clones=True)
+        res = tree.remove_many(
+            [tree["a1"], tree["a12"], tree["b11"], tree.find("a11"), tree["a2"]]
+        )
+        assert res == 3
+        assert tree._self_check()
+        assert fixture.check_content(
+            tree,
+            """
+            Tree<*>
+            +- A
+            `- B
+               `- b1
+                  `- a11
+            """,
+        )
+        assert tree.count == 4
+        assert tree._root.count_descendants(leaves_only=True) == 2
+        assert tree.remove_many([]) == 0
+
+        other = fixture.create_tree()
+        with pytest.raises(ValueError, match="not part of"):
+            tree.remove_many([other["A"]])
+
+    def test_fingerprint(self):
+        tree = fixture.create_tree()
+        fp = tree.fingerprint()
+        assert len(fp) == 32
+        assert tree.fingerprint() == fp
+        assert fixture.create_tree(name="other").fingerprint() == fp
+        assert tree._self_check()
+
+        a1 = tree["a1"]
+        fp_a1 = a1.fingerprint()
+        fp_b = tree["B"].fingerprint()
+        a1.add("a13")
+        assert a1.fingerprint() != fp_a1
+        assert tree.fingerprint() != fp
+        assert tree["B"].fingerprint() == fp_b
+        assert tree._self_check()
+        tree["a13"].remove()
+        assert a1.fingerprint() == fp_a1
+        assert tree.fingerprint() == fp
+
+        # Child order matters
+        tree["a1"].sort_children(reverse=True)
+        assert a1.fingerprint() != fp_a1
+        tree["a1"].sort_children()
+        assert tree.fingerprint() == fp
+
+        tree["a2"].move_to(tree["B"])
+        assert tree["B"].fingerprint() != fp_b
+        tree["a2"].move_to(tree["A"])
+        assert tree.fingerprint() == fp
+
+        tree["a12"].rename("a12x")
+        assert a1.fingerprint() != fp_a1
+        tree["a12x"].rename("a12")
+        assert tree.fingerprint() == fp
+
+        # Metadata is optional
+        fp_meta = tree.fingerprint(with_meta=True)
+        a1.set_meta("foo", 1)
+        assert tree.fingerprint() == fp
+        assert tree.fingerprint(with_meta=True) != fp_meta
+        a1.clear_meta()
+        assert tree.fingerprint(with_meta=True) == fp_meta
+        assert tree._self_check()
+
+    def test_child_index(self):
+        for child_index in (False, True):
+            tree = fixture.create_tree(
+                clones=True, tree=Tree("fixture", child_index=child_index)
+            )
+            a1 = tree["a1"]
+            assert a1.get_child("a12") is tree["a12"]
+            assert a1.get_child(data_id=hash("a11")).parent is a1
+            assert a1.get_child("b1") is None
+            assert tree["a12"].get_child("a11") is None
+            assert tree._root.get_child("B") is tree["B"]
+            assert tree._self_check()
+
+        # Duplicate data below one parent is rejected
+        with pytest.raises(UniqueConstraintError):
+            a1.add("a12")
+        with pytest.raises(UniqueConstraintError):
+            tree.find("a11").move_to(tree["b1"])
+        with pytest.raises(UniqueConstraintError):
+            tree["a12"].rename("a11")
+        assert tree.count == 9
+        assert tree._self_check()
+
+        # Maintained on add, remove, move, and set_data
+        a13 = a1.add("a13")
+        assert a1.get_child("a13") is a13
+        a13.rename("a14")
+        assert a1.get_child("a13") is None
+        assert a1.get_child("a14") is a13
+        a13.move_to(tree["B"])
+        assert a1.get_child("a14") is None
+        assert tree["B"].get_child("a14") is a13
+        a1.add("a14")
+        tree["A"].remove()
+        assert tree._root.get_child("A") is None
+        assert tree._self_check()
+
+        tree.clear()
+        assert tree._child_index == {}
+
+        data = ["A", "a1", "a1"]
+        tree = Tree.from_parent_indices(data, [-1, 0, -1], child_index=True)
+        assert tree._root.get_child("a1").depth() == 1
+        assert tree._self_check()
+        with pytest.raises(UniqueConstraintError):
+            Tree.from_parent_indices(data, [-1, 0, 0], child_index=True)
+
 
 class TestCopy:
     def test_node_copy(self):
@@ -957,6 +1360,26 @@ class TestCopy:
             """,
         )
 
+        tree = fixture.create_tree()
+
+        def pred(node):
+            if node.name == "a1":
+                return SkipBranch(and_self=False)
+            return node.name == "B"
+
+        tree.filter(predicate=pred)
+
+        assert tree._self_check()
+        assert fixture.check_content(
+            tree,
+            """
+            Tree<'fixture'>
+            ├── A
+            │   ╰── a1
+            ╰── B
+            """,
+        )
+
     def test_filtered(self):
         tree = fixture.create_tree()
 
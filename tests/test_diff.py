@@ -2,7 +2,11 @@
 # Licensed under the MIT license: https://www.opensource.org/licenses/mit-license.php
 """
 """
-from nutree import diff_node_formatter
+import json
+
+import pytest
+
+from nutree import DiffClassification, Tree, diff_node_formatter
 
 from . import fixture
 
@@ -82,3 +86,161 @@ class TestDiff:
             """,
             repr=diff_node_formatter,
         )
+
+    def test_diff_by_data_id(self):
+        """Peers are matched by data_id, so distinct but equivalent objects
+        (e.g. after a reload) are not reported as changes."""
+
+        def _calc_id(tree, data):
+            return data.guid
+
+        tree_0 = Tree("T0", calc_data_id=_calc_id)
+        tree_1 = Tree("T1", calc_data_id=_calc_id)
+        for i in range(1000):
+            tree_0.add(fixture.Person(f"p{i}", age=i, guid=i))
+            tree_1.add(fixture.Person(f"p{i}", age=i, guid=i), before=True)
+        tree_1.first_child().remove()
+        tree_1.add(fixture.Person("new", age=1, guid="new"))
+
+        tree_2 = tree_0.diff(tree_1, reduce=True)
+        assert [n.data.name for n in tree_2] == ["p999", "new"]
+        assert tree_2.first_child().get_meta("dc") == DiffClassification.REMOVED
+        assert tree_2.last_child().get_meta("dc") == DiffClassification.ADDED
+
+        tree_2 = tree_0.diff(tree_1, ordered=True)
+        assert tree_2.count == 1001
+        assert tree_2.find(match="Person<p0,.*").get_meta("dc") == (0, 998)
+        assert tree_2.find(match="Person<p998,.*").get_meta("dc") == (998, 0)
+        assert tree_2._root.get_meta("dc_renumbered")
+
+    def test_diff_ops(self):
+        tree_0 = fixture.create_tree(name="T0", print=False)
+        tree_1 = fixture.create_tree(name="T1", print=False)
+
+        tree_1["a2"].add("a21")
+        tree_1["a11"].remove()
+        tree_1.add_child("C")
+        tree_1["b1"].move_to(tree_1["C"])
+
+        def _id(name):
+            return tree_1[name].data_id
+
+        ops = list(tree_0.diff_ops(tree_1))
+        assert ops == [
+            {
+                "op": "add",
+                "parent": (),
+                "index": 2,
+                "after": _id("B"),
+                "data_id": _id("C"),
+                "data": "C",
+            },
+            {
+                "op": "add",
+                "parent": (_id("A"), _id("a2")),
+                "index": 0,
+                "after": None,
+                "data_id": _id("a21"),
+                "data": "a21",
+            },
+            {
+                "op": "move",
+                "parent": (_id("C"),),
+                "index": 0,
+                "after": None,
+                "data_id": _id("b1"),
+            },
+            {
+                "op": "remove",
+                "parent": (_id("A"), _id("a1")),
+                "data_id": tree_0["a11"].data_id,
+            },
+        ]
+        assert list(tree_0.diff_ops(tree_0.copy())) == []
+
+        tree_1 = tree_0.copy()
+        tree_1["a1"].sort_children(reverse=True)
+        assert list(tree_1.diff_ops(tree_0)) == []
+        assert list(tree_1.diff_ops(tree_0, ordered=True)) == [
+            {
+                "op": "reorder",
+                "parent": (_id("A"), _id("a1")),
+                "order": [tree_0["a11"].data_id, tree_0["a12"].data_id],
+            }
+        ]
+
+    def test_apply_patch(self):
+        tree_0 = fixture.create_tree(name="T0", print=False)
+        tree_1 = fixture.create_tree(name="T1", print=False)
+
+        tree_1["a2"].add("a21")
+        tree_1["a11"].remove()
+        tree_1.add_child("C")
+        tree_1["b1"].move_to(tree_1["C"])
+        tree_1["A"].sort_children(reverse=True)
+
+        replica = tree_0.copy()
+        patch = list(tree_0.diff_ops(tree_1, ordered=True))
+        # Patches can be serialized, if data is serializable
+        patch = json.loads(json.dumps(patch))
+        assert replica.apply_patch(patch) == len(patch) == 5
+        assert fixture.trees_equal(replica, tree_1)
+        assert replica._self_check()
+        assert list(replica.diff_ops(tree_1, ordered=True)) == []
+
+        # Map added data
+        replica = tree_0.copy()
+        replica.apply_patch(
+            tree_0.diff_ops(tree_1), mapper=lambda parent, data: data.lower()
+        )
+        assert replica.find(match="c").first_child().name == "b1"
+        assert replica._self_check()
+
+        with pytest.raises(ValueError, match="Invalid patch operation"):
+            replica.apply_patch([{"op": "foo", "parent": ()}])
+        with pytest.raises(KeyError):
+            replica.apply_patch([{"op": "remove", "parent": (), "data_id": "x"}])
+
+        # Parents are matched by path, even if the data_id is unique
+        tree_1 = tree_0.copy()
+        tree_1["a1"].add("a13")
+        patch = list(tree_0.diff_ops(tree_1))
+        replica = tree_0.copy()
+        replica["a1"].move_to(replica["B"])
+        assert replica["a1"].depth() == tree_0["a1"].depth()
+        with pytest.raises(KeyError):
+            replica.apply_patch(patch)
+        assert replica.find("a13") is None
+
+    def test_diff_identical_branches(self):
+        tree_0 = fixture.create_tree(name="T0", print=False)
+        tree_1 = tree_0.copy(name="T1")
+
+        assert tree_0.diff(tree_1, reduce=True).count == 0
+        tree_2 = tree_0.diff(tree_1)
+        assert fixture.trees_equal(tree_2, tree_0)
+        assert not any(n.meta for n in tree_2)
+
+        # Identical branches are skipped, but still copied if not reduced
+        tree_1["b11"].add("b111")
+        tree_2 = tree_0.diff(tree_1)
+        assert tree_2.count == tree_0.count + 1
+        assert tree_2["a12"].meta is None
+        tree_2 = tree_0.diff(tree_1, reduce=True)
+        assert [n.name for n in tree_2] == ["B", "b1", "b11", "b111"]
+        assert tree_2["b111"].get_meta("dc") == DiffClassification.ADDED
+
+        # diff() does not create fingerprint caches, but reuses existing ones
+        assert not tree_0._fingerprints and not tree_1._fingerprints
+        tree_0.fingerprint()
+        tree_1.fingerprint()
+        cache = tree_1._fingerprints[False]
+        assert len(cache) == tree_1.count + 1
+        tree_1["a2"].add("a21")
+        tree_2 = tree_0.diff(tree_1, reduce=True)
+        assert [n.name for n in tree_2] == ["A", "a2", "a21", "B", "b1", "b11", "b111"]
+        assert tree_1._fingerprints[False] is cache
+        tree_0.clear_fingerprints()
+        tree_1.clear_fingerprints()
+        assert not tree_0._fingerprints and not tree_1._fingerprints
+        assert tree_0._self_check() and tree_1._self_check()
@@ -0,0 +1,181 @@
+# (c) 2021-2023 Martin Wendt; see https://github.com/mar10/nutree
+# Licensed under the MIT license: https://www.opensource.org/licenses/mit-license.php
+"""
+"""
+import io
+import re
+
+import pytest
+
+from nutree import AmbiguousMatchError, FrozenNode, FrozenTree, IterMethod, Tree
+from nutree.typed_tree import TypedTree
+
+from . import fixture
+
+
+class TestFrozenTree:
+    def test_basics(self):
+        tree = fixture.create_tree(clones=True)
+        frozen = tree.freeze()
+
+        assert isinstance(frozen, FrozenTree)
+        assert f"{frozen}" == "FrozenTree<'fixture'>"
+        assert frozen.count == len(frozen) == tree.count == 9
+        assert frozen.count_unique == tree.count_unique == 8
+        assert frozen.calc_height() == 3
+        assert "a11" in frozen
+        assert "X" not in frozen
+
+        with pytest.raises(NotImplementedError):
+            _ = frozen == tree
+
+        assert not Tree().freeze()
+        assert Tree().freeze().first_child() is None
+
+        # Frozen trees are snapshots
+        tree.add("C")
+        assert frozen.count == 9
+
+        with pytest.raises(NotImplementedError, match="kind"):
+            TypedTree().freeze()
+
+    def test_navigate(self):
+        tree = fixture.create_tree(clones=True)
+        frozen = tree.freeze()
+
+        assert [n.name for n in frozen.children] == ["A", "B"]
+        assert frozen.last_child().name == "B"
+
+        a1 = frozen["a1"]
+        assert isinstance(a1, FrozenNode)
+        assert re.sub(r"data_id=[-\d]+>", "data_id=*>", f"{a1}") == (
+            "FrozenNode<'a1', data_id=*>"
+        )
+        assert a1 == "a1"
+        assert a1 == tree["a1"]
+        assert a1.tree is frozen
+        assert a1.path == "/A/a1"
+        assert a1.depth() == 2
+        assert a1.parent.name == "A"
+        assert a1.parent.parent is None
+        assert a1.get_top().name == "A"
+        assert a1.first_child().name == "a11"
+        assert a1.last_child().name == "a12"
+        assert a1.next_sibling().name == "a2"
+        assert a1.prev_sibling() is None
+        assert a1.next_sibling().prev_sibling() == a1
+        assert a1.is_first_sibling()
+        assert not a1.is_last_sibling()
+        assert a1.get_index() == 0
+        assert a1.next_sibling().get_index() == 1
+        assert [n.name for n in a1.get_siblings()] == ["a2"]
+        assert a1.count_descendants() == 2
+        assert frozen["A"].count_descendants(leaves_only=True) == 3
+        assert frozen["a2"].is_leaf()
+        assert not a1.is_top()
+        assert frozen["A"].is_top()
+
+        a12 = frozen["a12"]
+        assert a12.is_descendant_of(frozen["A"])
+        assert not a12.is_descendant_of(frozen["B"])
+        assert not a12.is_descendant_of(a12)
+        assert frozen["A"].is_ancestor_of(a12)
+        assert [n.name for n in a12.get_parent_list()] == ["A", "a1"]
+
+        with pytest.raises(AmbiguousMatchError):
+            frozen["a11"]
+        with pytest.raises(KeyError):
+            frozen["X"]
+
+        clones = frozen.find_all("a11")
+        assert len(clones) == 2
+        assert clones[0].is_clone()
+        assert [n.node_id for n in clones[0].get_clones()] == [clones[1].node_id]
+        assert [n.path for n in frozen["B"].find_all("a11")] == ["/B/b1/a11"]
+        assert frozen["B"].find("a12") is None
+
+        res = frozen.find_all(match=r"a1.*")
+        assert [n.path for n in res] == ["/A/a1", "/A/a1/a11", "/A/a1/a12", "/B/b1/a11"]
+        res = frozen.find_all(match=r"a1.*", max_results=2)
+        assert [n.name for n in res] == ["a1", "a11"]
+        assert frozen.find(match=lambda n: n.depth() == 3).path == "/A/a1/a11"
+
+    def test_iter(self):
+        tree = fixture.create_tree(clones=True)
+        frozen = tree.freeze()
+
+        for method in (
+            IterMethod.PRE_ORDER,
+            IterMethod.POST_ORDER,
+            IterMethod.LEVEL_ORDER,
+        ):
+            assert [n.path for n in frozen.iterator(method)] == [
+                n.path for n in tree.iterator(method)
+            ], method
+            a = frozen["A"]
+            assert [n.path for n in a.iterator(method, add_self=True)] == [
+                n.path for n in tree["A"].iterator(method, add_self=True)
+            ], method
+
+        res = sorted(n.path for n in frozen.iterator(IterMethod.RANDOM_ORDER))
+        assert res == sorted(n.path for n in tree)
+        res = sorted(n.path for n in frozen.iterator(IterMethod.UNORDERED))
+        assert res == sorted(n.path for n in tree)
+
+    def test_format(self):
+        tree = fixture.create_tree(clones=True)
+        frozen = tree.freeze()
+
+        for style in ("round43", "ascii32", "lines11"):
+            assert frozen.format(style=style, title="T") == tree.format(
+                style=style, title="T"
+            )
+        assert frozen.format(title=False) == tree.format(title=False)
+        assert frozen.format(repr="{node.name}", style="list", join=",") == (
+            "A,a1,a11,a12,a2,B,b1,a11,b11"
+        )
+        for n, fn in zip(tree, frozen):
+            assert n.format() == fn.format()
+            assert n.format(add_self=False) == fn.format(add_self=False)
+
+    def test_serialize(self, monkeypatch):
+        tree = fixture.create_tree(style="objects", clones=True)
+        frozen = tree.freeze()
+
+        assert frozen.to_dict() == tree.to_dict()
+        assert list(frozen.to_list_iter()) == list(tree.to_list_iter())
+
+        tree = fixture.create_tree(clones=True)
+        frozen = tree.freeze()
+        fp, fp_frozen = io.StringIO(), io.StringIO()
+        tree.save(fp)
+        frozen.save(fp_frozen)
+        assert fp_frozen.getvalue() == fp.getvalue()
+
+        # Records are written in chunks, but the output is the same
+        monkeypatch.setattr("nutree.tree._SAVE_CHUNK_SIZE", 2)
+        fp_chunked = io.StringIO()
+        frozen.save(fp_chunked)
+        assert fp_chunked.getvalue() == fp.getvalue()
+
+        fp_frozen.seek(0)
+        tree_2 = Tree.load(fp_frozen)
+        assert fixture.trees_equal(tree, tree_2)
+
+        # Custom data_ids are stored as dict
+        tree.add("custom", data_id="custom_id")
+        frozen = tree.freeze()
+        assert frozen.find(data_id="custom_id").name == "custom"
+        assert frozen.to_dict() == tree.to_dict()
+        assert list(frozen.to_list_iter()) == list(tree.to_list_iter())
+
+    def test_thaw(self):
+        tree = fixture.create_tree(clones=True)
+        tree.add("custom", data_id="custom_id")
+        tree_2 = tree.freeze().thaw()
+
+        assert isinstance(tree_2, Tree)
+        assert tree_2._self_check()
+        assert fixture.trees_equal(tree, tree_2)
+        assert tree_2.find(data_id="custom_id").name == "custom"
+        assert len(tree_2.find_all("a11")) == 2
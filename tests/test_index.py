@@ -0,0 +1,320 @@
+# (c) 2021-2023 Martin Wendt; see https://github.com/mar10/nutree
+# Licensed under the MIT license: https://www.opensource.org/licenses/mit-license.php
+"""
+"""
+import re
+
+import pytest
+
+from nutree import Tree, TypedTree
+from nutree.index import required_literals
+
+from . import fixture
+
+
+class TestNameIndex:
+    def test_required_literals(self):
+        assert required_literals("abc") == ["abc"]
+        assert required_literals("a.*foo") == ["a", "foo"]
+        assert required_literals(r".*\.txt") == [".txt"]
+        assert required_literals("x(abc)?def") == ["x", "def"]
+        assert required_literals("ab?cd") == ["a", "cd"]
+        assert required_literals("ab+c") == ["ab", "c"]
+        assert required_literals("pre[]x]post") == ["pre", "post"]
+        assert required_literals(r"\d+abc{2,3}") == ["ab"]
+        assert required_literals(".*") == []
+        # Not supported
+        assert required_literals("foo|bar") is None
+        assert required_literals("(?i)foo") is None
+        assert required_literals("foo", re.IGNORECASE) is None
+        assert required_literals(r"\x41bc.*") is None
+        assert required_literals(r"\101bc") is None
+        assert required_literals(r"(a)b\1") is None
+        assert required_literals(r"\N{LATIN SMALL LETTER E WITH ACUTE}tude") is None
+
+    def test_find(self):
+        tree = fixture.create_tree(tree=Tree("fixture", name_index=True))
+        tree["B"].add("Gamma.txt")
+        tree["a1"].add("Alpha.txt")
+        tree["A"].add("alpha.md")
+        assert tree._self_check()
+
+        res = tree.find_all(match=r".*\.txt")
+        assert [n.name for n in res] == ["Gamma.txt", "Alpha.txt"]
+        res = tree["A"].find_all(match=r".*\.txt")
+        assert [n.name for n in res] == ["Alpha.txt"]
+        assert tree["A"].find_first(match=r"Alpha\..*").name == "Alpha.txt"
+        res = tree["a1"].find_all(match=r"a1.*", add_self=True)
+        assert [n.name for n in res] == ["a1", "a11", "a12"]
+        res = tree["a1"].find_all(match=r"Alpha.txt", add_self=True)
+        assert [n.name for n in res] == ["Alpha.txt"]
+        assert tree.find_all(match=r".*\.txt", max_results=1) == [tree["Gamma.txt"]]
+        assert tree.find_all(match="not_there") == []
+        # Fallback to full scan
+        res = tree.find_all(match=(r"alpha.*", re.IGNORECASE))
+        assert [n.name for n in res] == ["Alpha.txt", "alpha.md"]
+        res = tree.find_all(match=lambda n: n.name.endswith(".md"))
+        assert [n.name for n in res] == ["alpha.md"]
+
+        # Index is maintained
+        tree["Alpha.txt"].rename("Beta.txt")
+        tree["Gamma.txt"].remove()
+        assert tree.find_all(match=r"Alpha.*") == []
+        res = tree.find_all(match=r".*\.txt")
+        assert [n.name for n in res] == ["Beta.txt"]
+        assert tree._self_check()
+
+        # Clones
+        tree["b1"].add(tree["a12"])
+        res = tree.find_all(match="a12")
+        assert [n.path for n in res] == ["/A/a1/a12", "/B/b1/a12"]
+        tree["a11"].set_data("a12_new")
+        res = tree.find_all(match="a12.*")
+        assert [n.path for n in res] == ["/A/a1/a12", "/B/b1/a12", "/A/a1/a12_new"]
+        assert tree._self_check()
+
+        # Escapes give the same results as a full scan
+        plain = fixture.create_tree()
+        for t in (tree, plain):
+            t.add("Abcdef")
+            t.add("Abc")
+            t.add("\u00e9tude")
+            t.add("xx")
+        for pattern in (
+            r"\x41bc.*",
+            r"\101bc",
+            r"\u00e9tu.*",
+            r"\N{LATIN SMALL LETTER E WITH ACUTE}tude",
+            r"(x)\1",
+            r"\w+bc\w*",
+        ):
+            res = [n.name for n in tree.find_all(match=pattern)]
+            assert res
+            assert res == [n.name for n in plain.find_all(match=pattern)], pattern
+
+        tree_2 = Tree.from_parent_indices(["Alpha.txt", "b"], [-1, 0], name_index=True)
+        assert tree_2.find(match=r".*\.txt").name == "Alpha.txt"
+        assert tree_2._self_check()
+        tree.clear()
+        assert tree._self_check()
+
+
+class TestHashIndex:
+    def test_find_by(self):
+        tree = Tree("fixture")
+        fixture.create_tree(style="objects", clones=True, tree=tree)
+
+        def _age(node):
+            return getattr(node.data, "age", None)
+
+        tree.add_index("age", _age)
+        with pytest.raises(ValueError, match="already exists"):
+            tree.add_index("age", _age)
+        with pytest.raises(KeyError):
+            tree.find_by("unknown", 42)
+
+        res = tree.find_by("age", 43)
+        assert len(res) == 2
+        assert all(n.data.name == "Charleen" for n in res)
+        assert tree.find_by("age", 99) == []
+        assert tree.find_by("age", None) == []
+        assert tree._self_check()
+
+        # Maintained on add, remove, and set_data
+        dev = tree.first_child()
+        eve = dev.add(fixture.Person("Eve", age=43))
+        assert len(tree.find_by("age", 43)) == 3
+        eve.set_data(fixture.Person("Eve", age=44))
+        assert len(tree.find_by("age", 43)) == 2
+        assert tree.find_by("age", 44)[0] is eve
+        tree.find_by("age", 43)[0].remove()
+        assert len(tree.find_by("age", 43)) == 1
+        assert tree._self_check()
+
+        # In-place modification requires reindex()
+        eve.data.age = 45
+        assert tree.find_by("age", 45) == []
+        tree.reindex("age")
+        assert tree.find_by("age", 45) == [eve]
+        assert tree.find_by("age", 44) == []
+        tree.reindex()
+        assert tree._self_check()
+
+        tree.remove_index("age")
+        with pytest.raises(KeyError):
+            tree.find_by("age", 45)
+        assert tree._self_check()
+
+    def test_failing_key(self):
+        """A key that raises leaves the tree unchanged."""
+        tree = fixture.create_tree(
+            tree=Tree("fixture", name_index=True, child_index=True)
+        )
+        tree.add_index("len", lambda node: len(node.name))
+        tree.add_index("k", lambda node: 1 / 0 if node.name == "bad" else 1)
+        count = len(tree)
+
+        with pytest.raises(ZeroDivisionError):
+            tree.add("bad")
+        with pytest.raises(ZeroDivisionError):
+            tree["a1"].add("bad")
+        assert len(tree) == count
+        assert len(list(tree)) == count
+        assert tree.find("bad") is None
+        assert tree.find_by("len", 3) == tree.find_all(match="...")
+        assert tree._self_check()
+
+        # The rejected data can be added after the index was removed
+        tree.remove_index("k")
+        tree.add("bad")
+        assert tree._self_check()
+
+        # set_data() keeps the previous data and index entries
+        tree.add_index("k", lambda node: 1 / 0 if node.name == "boom" else 1)
+        a1 = tree["a1"]
+        with pytest.raises(ZeroDivisionError):
+            a1.set_data("boom")
+        assert a1.name == "a1"
+        assert tree["a1"] is a1
+        assert {n.name for n in tree.find_by("len", 2)} == {"a1", "a2", "b1"}
+        assert tree._self_check()
+        clone = tree["b1"].add(tree["a11"])
+        with pytest.raises(ZeroDivisionError):
+            clone.set_data("boom", with_clones=True)
+        assert [n.name for n in tree.find_all(data_id=clone.data_id)] == ["a11"] * 2
+        assert tree._self_check()
+        a1.set_data("a1_new")
+        assert tree.find_by("len", 6) == [a1]
+        a1.remove()
+        tree.remove_index("k")
+        assert tree._self_check()
+
+        # Unhashable keys
+        tree.add_index("h", lambda node: [1] if node.name == "bad2" else 1)
+        with pytest.raises(TypeError):
+            tree.add("bad2")
+        assert len(tree._indexes["h"]) == len(tree)
+        assert tree.find("bad2") is None
+        assert tree._self_check()
+
+    def test_typed_tree(self):
+        tree = TypedTree("fixture")
+        tree.add_index("kind", lambda node: node.kind)
+        a = tree.add("A", kind="letter")
+        a.add("a1", kind="letter")
+        a.add(1, kind="number")
+        assert [n.name for n in tree.find_by("kind", "letter")] == ["A", "a1"]
+        assert [n.name for n in tree.find_by("kind", "number")] == ["1"]
+        assert tree._self_check()
+
+    def test_multiple(self):
+        tree = fixture.create_tree(tree=Tree("fixture", name_index=True))
+        tree.add_index("len", lambda node: len(node.name))
+        tree.add_index("top", lambda node: node.get_top().name)
+
+        assert [n.name for n in tree.find_by("len", 1)] == ["A", "B"]
+        assert [n.name for n in tree.find_by("top", "B")] == ["B", "b1", "b11"]
+        tree["a1"].rename("a_1")
+        assert [n.name for n in tree.find_by("len", 3)] == ["a11", "a12", "b11", "a_1"]
+        assert tree.find(match="a_1.*").name == "a_1"
+        tree.remove_many([tree["A"]])
+        assert tree.find_by("len", 3) == [tree["b11"]]
+        assert tree._self_check()
+
+        # The name index is separate from user indexes
+        with pytest.raises(KeyError):
+            tree.find_by("__name__", "b1")
+        with pytest.raises(KeyError):
+            tree.remove_index("__name__")
+        tree.add_index("__name__", lambda node: node.name)
+        assert tree.find_by("__name__", "b1") == [tree["b1"]]
+        tree.remove_index("__name__")
+        assert tree.find(match="b1.*").name == "b1"
+        assert tree._name_index is not None
+        assert tree._self_check()
+
+
+class TestSortedIndex:
+    def test_find_range(self):
+        tree = Tree("fixture")
+        fixture.create_tree(style="objects", clones=True, tree=tree)
+
+        def _age(node):
+            return getattr(node.data, "age", None)
+
+        def _names(nodes):
+            return [n.data.name for n in nodes]
+
+        tree.add_index("age", _age, ordered=True)
+        tree.add_index("age_hash", _age)
+        with pytest.raises(ValueError, match="not ordered"):
+            tree.find_range("age_hash", 20, 30)
+        with pytest.raises(KeyError):
+            tree.find_range("unknown")
+        assert tree._self_check()
+
+        assert _names(tree.find_range("age")) == [
+            "Alice",
+            "Bob",
+            "Charleen",
+            "Charleen",
+            "Dave",
+        ]
+        assert _names(tree.find_range("age", 30, 43)) == ["Bob", "Charleen", "Charleen"]
+        assert _names(tree.find_range("age", 33, 42)) == []
+        assert _names(tree.find_range("age", low=43)) == [
+            "Charleen",
+            "Charleen",
+            "Dave",
+        ]
+        assert _names(tree.find_range("age", high=32)) == ["Alice", "Bob"]
+        # min / max / top-k
+        assert _names(tree.find_range("age", max_results=1)) == ["Alice"]
+        assert _names(tree.find_range("age", reverse=True, max_results=1)) == ["Dave"]
+        assert _names(tree.find_range("age", high=43, reverse=True, max_results=2)) == [
+            "Charleen",
+            "Charleen",
+        ]
+        assert len(tree.find_by("age", 43)) == 2
+        # None keys are not indexed
+        assert tree.find_by("age", None) == []
+        assert tree.find_by("age_hash", None) == []
+
+        # Maintained on add, remove, and set_data
+        dev = tree.first_child()
+        eve = dev.add(fixture.Person("Eve", age=20))
+        assert tree.find_range("age", max_results=1) == [eve]
+        eve.set_data(fixture.Person("Eve", age=60))
+        assert tree.find_range("age", reverse=True, max_results=1) == [eve]
+        tree.find_range("age", 40, 50)[0].remove()
+        assert _names(tree.find_range("age", 40, 50)) == ["Charleen"]
+        eve.remove()
+        assert _names(tree.find_range("age", low=50)) == ["Dave"]
+        assert tree._self_check()
+
+        # In-place modification requires reindex()
+        tree.find_first(match="Person<Alice.*").data.age = 99
+        tree.reindex("age")
+        assert _names(tree.find_range("age", low=90)) == ["Alice"]
+        assert tree._self_check()
+
+    def test_incomparable_keys(self):
+        """Keys that cannot be compared leave the index unchanged."""
+
+        def _key(node):
+            return 1 if node.name == "bad" else node.name
+
+        tree = fixture.create_tree()
+        tree.add_index("k", _key, ordered=True)
+        with pytest.raises(TypeError):
+            tree.add("bad")
+        assert tree.find("bad") is None
+        assert len(tree._indexes["k"]) == len(tree)
+        assert tree._self_check()
+
+        tree.remove_index("k")
+        tree.add("bad")
+        with pytest.raises(TypeError):
+            tree.add_index("k", _key, ordered=True)
+        assert "k" not in tree._indexes
+        assert tree._self_check()
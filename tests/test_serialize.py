@@ -2,10 +2,13 @@
 # Licensed under the MIT license: https://www.opensource.org/licenses/mit-license.php
 """
 """
+import io
 import json
 import tempfile
 
-from nutree import Node, Tree
+import pytest
+
+from nutree import Node, Tree, TypedTree
 from nutree.diff import DiffClassification, diff_node_formatter
 
 from . import fixture
@@ -38,6 +41,62 @@ class TestSerialize:
         assert tree._self_check()
         assert tree_2._self_check()
 
+    def test_from_parent_indices(self):
+        tree = fixture.create_tree(clones=True)
+        data = [n.data for n in tree]
+        parents = [-1, 0, 1, 1, 0, -1, 5, 6, 6]
+
+        tree_2 = Tree.from_parent_indices(data, parents, name="fixture")
+        assert fixture.trees_equal(tree, tree_2)
+        assert tree_2._self_check()
+        assert len(tree_2.find_all("a11")) == 2
+        assert tree_2["a12"].get_index() == 1
+        assert tree_2["b11"].depth() == 3
+
+        # Custom node factory and data_ids, subtree counts
+        data_ids = [None] * len(data)
+        data_ids[-1] = "b11_id"
+        tree_2 = Tree.from_parent_indices(data, parents, data_ids, track_counts=True)
+        assert tree_2._self_check()
+        assert tree_2.find(data_id="b11_id").name == "b11"
+        assert tree_2["A"].count_descendants() == 4
+        assert tree_2.count == 9
+
+        class CustomNode(Node):
+            pass
+
+        tree_2 = Tree.from_parent_indices(data, parents, factory=CustomNode)
+        assert fixture.trees_equal(tree, tree_2)
+        assert isinstance(tree_2["B"], CustomNode)
+        assert tree_2._self_check()
+
+        class CustomTree(Tree):
+            pass
+
+        tree_2 = CustomTree.from_parent_indices(data, parents)
+        assert isinstance(tree_2, CustomTree)
+        assert list(tree_2.to_list_iter()) == list(tree.to_list_iter())
+
+        kinds = ["letter"] * len(data)
+        kinds[3] = "other"
+        typed = TypedTree.from_parent_indices(data, parents, kinds=kinds)
+        assert isinstance(typed, TypedTree)
+        assert [n.kind for n in typed] == kinds
+        assert [n.name for n in typed] == [n.name for n in tree]
+        assert typed["a1"].get_children("other") == [typed["a12"]]
+        assert typed._self_check()
+        with pytest.raises(ValueError, match="equal length"):
+            TypedTree.from_parent_indices(data, parents, kinds=["letter"])
+
+        with pytest.raises(ValueError, match="Invalid parent index"):
+            Tree.from_parent_indices(["a", "b"], [-1, 1])
+        with pytest.raises(ValueError, match="Invalid parent index"):
+            Tree.from_parent_indices(["a", "b"], [-1, -2])
+        with pytest.raises(ValueError, match="equal length"):
+            Tree.from_parent_indices(["a", "b"], [-1])
+        with pytest.raises(ValueError, match="equal length"):
+            Tree.from_parent_indices(["a", "b"], [-1, 0], ["a"])
+
     def test_serialize_list(self):
         tree = fixture.create_tree()
 
@@ -69,6 +128,52 @@ class TestSerialize:
         assert tree._self_check()
         assert tree_2._self_check()
 
+    def test_save_chunks(self, monkeypatch):
+        """save() writes chunks, but the result is the same as json.dump()."""
+        tree = fixture.create_tree(clones=True)
+        expected = json.dumps(list(tree.to_list_iter()))
+
+        for chunk_size in (1, 2, 9, 100):
+            monkeypatch.setattr("nutree.tree._SAVE_CHUNK_SIZE", chunk_size)
+            fp = io.StringIO()
+            tree.save(fp)
+            assert fp.getvalue() == expected
+
+        fp = io.StringIO()
+        Tree().save(fp)
+        assert fp.getvalue() == "[]"
+
+    def test_load_chunks(self, monkeypatch):
+        """load() parses records incrementally, even if split across chunks."""
+        tree = fixture.create_tree(clones=True)
+        fp = io.StringIO()
+        tree.save(fp)
+        text = fp.getvalue()
+
+        for chunk_size in (1, 3, 100):
+            monkeypatch.setattr("nutree.tree._LOAD_CHUNK_SIZE", chunk_size)
+            tree_2 = Tree.load(io.StringIO(text))
+            assert fixture.trees_equal(tree, tree_2)
+            assert len(tree_2.find_all("a11")) == 2
+            assert tree_2._self_check()
+
+            tree_2 = Tree.load(io.StringIO(" [\n" + text[1:-1] + " ] \n"))
+            assert fixture.trees_equal(tree, tree_2)
+
+            assert Tree.load(io.StringIO("[]")).count == 0
+
+            for invalid in ("", "{}", "[[0, 'a']]", '[[0, "a"] [0, 1]]', "[] x"):
+                with pytest.raises(json.JSONDecodeError):
+                    Tree.load(io.StringIO(invalid))
+
+        # Corrupt record indexes
+        for invalid in ('[[0, "a"], [-1, "b"]]', '[[0, "a"], [2, "b"]]'):
+            with pytest.raises(ValueError, match="Invalid parent index at #2"):
+                Tree.load(io.StringIO(invalid))
+        for invalid in ('[[0, "a"], [1, 0]]', '[[0, "a"], [1, 2]]'):
+            with pytest.raises(ValueError, match="Invalid clone index at #2"):
+                Tree.load(io.StringIO(invalid))
+
     def test_serialize_list_obj(self):
         """Save/load an object tree with clones.
 